@@ -0,0 +1,158 @@
+"""Micro-benchmark: iterative ``render_markdown`` vs the legacy recursive converter.
+
+    python benchmarks/bench_markdown.py [--repeat 5] [--json]
+
+Both renderers run over the same BeautifulSoup tree, so the numbers isolate
+markdown generation from parsing. Reports wall time per run, tracemalloc
+peak memory and output size for the fixture corpus plus generated long and
+deeply nested articles. The iterative renderer also keeps links, bold text,
+images and inline code inside ``<span>`` wrappers, so its output is larger.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "src" / "providers" / "wechat" / "src")]
+
+from bs4 import BeautifulSoup  # noqa: E402
+from bs4.element import NavigableString, Tag  # noqa: E402
+
+from wechat.extract.bs4_backend import _ADAPTER  # noqa: E402
+from wechat.extract.markdown import render_markdown  # noqa: E402
+
+
+def _legacy_convert(tag: Tag, img_counter: Dict[str, int]) -> str:
+    # Verbatim copy of the pre-iterative ``_convert_tag_to_markdown``.
+    markdown_str = ""
+    if tag.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+        level = int(tag.name[1])
+        markdown_str = f"{'#' * level} {tag.get_text(strip=True)}\n\n"
+    elif tag.name in ["p", "section", "div"]:
+        for child in tag.children:
+            if isinstance(child, NavigableString):
+                markdown_str += str(child)
+            elif isinstance(child, Tag) and child.name == "img":
+                img_src = child.get("data-src") or child.get("src") or ""
+                img_src = str(img_src)
+                if img_src.startswith("//"):
+                    img_src = f"https:{img_src}"
+                alt_text = str(child.get("alt") or "image")
+                img_counter["value"] += 1
+                markdown_str += f"![{alt_text}]({img_src})\n"
+            elif isinstance(child, Tag) and child.name == "br":
+                markdown_str += "\n"
+            elif isinstance(child, Tag):
+                markdown_str += _legacy_convert(child, img_counter)
+        markdown_str += "\n\n"
+    elif tag.name == "blockquote":
+        content = tag.get_text(separator="\n", strip=True)
+        markdown_str = "".join([f"> {line}\n" for line in content.split("\n")]) + "\n"
+    elif tag.name == "pre":
+        code_content = tag.get_text()
+        markdown_str = f"```\n{code_content.strip()}\n```\n\n"
+    elif tag.name == "a":
+        link_text = tag.get_text(strip=True)
+        href = tag.get("href", "")
+        markdown_str = f"[{link_text}]({href})"
+    elif tag.name == "strong":
+        markdown_str = f"**{tag.get_text(strip=True)}**"
+    else:
+        markdown_str = tag.get_text()
+    return markdown_str
+
+
+def legacy(content: Tag) -> str:
+    counter = {"value": 0}
+    return "".join(_legacy_convert(tag, counter) for tag in content.find_all(recursive=False)).strip()
+
+
+def iterative(content: Tag) -> str:
+    markdown, _ = render_markdown(_ADAPTER, content.find_all(recursive=False))
+    return markdown.strip()
+
+
+def _wrap(body: str) -> str:
+    return f'<html><body><div class="rich_media_content" id="js_content">{body}</div></body></html>'
+
+
+def generated_cases() -> Dict[str, str]:
+    paragraph = "<p><span>这是一段用于测试的正文内容，包含 <strong>加粗</strong> 与 <a href='https://example.com'>链接</a>。</span></p>"
+    long_body = "".join(f"<section><section>{paragraph * 3}</section></section>" for _ in range(3000))
+    deep_body = "<section>" * 400 + paragraph * 50 + "</section>" * 400
+    very_deep_body = "<section>" * 3000 + paragraph + "</section>" * 3000
+    return {
+        "generated/long_3000_sections": _wrap(long_body),
+        "generated/nested_400": _wrap(deep_body),
+        "generated/nested_3000": _wrap(very_deep_body),
+    }
+
+
+def measure(func: Callable[[Tag], str], content: Tag, repeat: int) -> Dict[str, Any]:
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            output = func(content)
+        elapsed = (time.perf_counter() - start) / repeat
+        tracemalloc.start()
+        func(content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    except RecursionError:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {"error": "RecursionError"}
+    return {"ms": round(elapsed * 1000, 3), "peak_kib": round(peak / 1024, 1), "out_chars": len(output)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    cases = {f"fixtures/{p.name}": p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))}
+    cases.update(generated_cases())
+
+    results: List[Dict[str, Any]] = []
+    for name, html in cases.items():
+        soup = BeautifulSoup(html, "html.parser")
+        content = soup.find("div", class_="rich_media_content") or soup.find("div", id="js_content")
+        if content is None:
+            continue
+        results.append(
+            {
+                "case": name,
+                "html_kib": round(len(html.encode("utf-8")) / 1024, 1),
+                "legacy": measure(legacy, content, args.repeat),
+                "iterative": measure(iterative, content, args.repeat),
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(
+        f"{'case':36} {'KiB':>8} {'legacy ms':>10} {'iter ms':>10} "
+        f"{'legacy peak':>12} {'iter peak':>12} {'legacy out':>11} {'iter out':>11}"
+    )
+    for row in results:
+        old, new = row["legacy"], row["iterative"]
+        print(
+            f"{row['case']:36} {row['html_kib']:>8} "
+            f"{old.get('ms', old.get('error')):>10} {new.get('ms', new.get('error')):>10} "
+            f"{old.get('peak_kib', '-'):>12} {new.get('peak_kib', '-'):>12} "
+            f"{old.get('out_chars', '-'):>11} {new.get('out_chars', '-'):>11}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
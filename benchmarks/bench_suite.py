@@ -0,0 +1,339 @@
+"""Offline end-to-end benchmarks: parsing, article fetch, /call throughput and MCP calls.
+
+    python benchmarks/bench_suite.py [--scenarios parse,fetch,call,mcp] [--output results.json]
+                                     [--compare baseline.json]
+
+Everything runs against loopback: the fixtures in ``benchmarks/fixtures`` are
+served by a local HTTP server standing in for mp.weixin.qq.com, and the app
+runs under uvicorn on an ephemeral port with a throwaway config and database.
+Results are JSON (commit, environment, one entry per scenario) so runs from
+different commits can be diffed with ``--compare``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "src" / "providers" / "wechat" / "src")]
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from wechat.extract import get_extractor  # noqa: E402
+
+SCENARIOS = ("parse", "fetch", "call", "mcp")
+# Fixtures that parse into an article (verification.html is the captcha wall).
+ARTICLE_FIXTURES = ("basic.html", "nested_sections.html", "long_article.html", "empty_content.html")
+MCP_HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@contextmanager
+def fixture_server() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=str(FIXTURES)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def app_server(backend: str) -> Iterator[str]:
+    from mcp_server.main import create_app
+
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as tmp:
+        config_path = Path(tmp) / "config.toml"
+        config_path.write_text(
+            "[database]\n"
+            'sqlite_path = "bench.sqlite3"\n\n'
+            "[cookies]\n"
+            'base_path = "cookies"\n\n'
+            "[wechat]\n"
+            "# Every fetch must really run; a reused result would have no phases.\n"
+            "coalesce_window = 0\n\n"
+            "[wechat.extract]\n"
+            f'backend = "{backend}"\n',
+            encoding="utf-8",
+        )
+        app = create_app(config_path)
+        # Per-request INFO logs from the app and httpx would dominate the measurements.
+        logging.getLogger().setLevel(logging.WARNING)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="on"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        try:
+            yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+        finally:
+            server.should_exit = True
+            thread.join()
+            sock.close()
+
+
+def summarize(latencies: List[float], wall: Optional[float] = None) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+    result: Dict[str, Any] = {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+    if wall:
+        result["rps"] = round(len(ordered) / wall, 1)
+    return result
+
+
+async def run_concurrently(
+    total: int, concurrency: int, call: Callable[[int], Awaitable[None]]
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def scenario_parse(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for backend in ("bs4", "lxml"):
+        try:
+            extractor = get_extractor(backend)
+        except ModuleNotFoundError:
+            results[backend] = {"skipped": "not installed"}
+            continue
+        per_fixture = {}
+        for name in ARTICLE_FIXTURES:
+            html = (FIXTURES / name).read_text(encoding="utf-8")
+            extractor.extract(html)
+            latencies = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                extractor.extract(html)
+                latencies.append(time.perf_counter() - start)
+            per_fixture[name] = summarize(latencies)
+        results[backend] = per_fixture
+    return results
+
+
+async def scenario_fetch(args: argparse.Namespace, app_url: str, origin: str) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(base_url=app_url, timeout=60) as client:
+        for cached in (False, True):
+            for name in ARTICLE_FIXTURES:
+                body = {
+                    "tool": "wechat.article.fetch",
+                    "input": {"url": f"{origin}/{name}", "save_files": False, "use_cache": cached},
+                    "options": {"timings": True},
+                }
+                await client.post("/call", json=body)
+                latencies: List[float] = []
+                phases: Dict[str, List[float]] = {}
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    resp = (await client.post("/call", json=body)).json()
+                    latencies.append(time.perf_counter() - start)
+                    phases_ms = resp["meta"]["timings"]["phases_ms"]
+                    if not phases_ms or resp["meta"].get("coalesced"):
+                        raise RuntimeError(f"fetch of {name} was not measured: {resp['meta']}")
+                    for phase, ms in phases_ms.items():
+                        phases.setdefault(phase, []).append(ms)
+                entry = summarize(latencies)
+                entry["phases_mean_ms"] = {k: round(statistics.fmean(v), 3) for k, v in sorted(phases.items())}
+                results[f"{'cached' if cached else 'uncached'}/{name}"] = entry
+    return results
+
+
+async def scenario_call(args: argparse.Namespace, app_url: str, origin: str) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=app_url, timeout=60, limits=limits) as client:
+
+        async def hello(_: int) -> None:
+            resp = await client.post("/call", json={"tool": "hello.say", "input": {}})
+            resp.raise_for_status()
+
+        fetch_body = {
+            "tool": "wechat.article.fetch",
+            "input": {"url": f"{origin}/basic.html", "save_files": False, "use_cache": False},
+        }
+
+        async def fetch(_: int) -> None:
+            resp = await client.post("/call", json=fetch_body)
+            resp.raise_for_status()
+
+        return {
+            "hello.say": await run_concurrently(args.requests, args.concurrency, hello),
+            "wechat.article.fetch": await run_concurrently(args.requests, args.concurrency, fetch),
+        }
+
+
+async def scenario_mcp(args: argparse.Namespace, app_url: str, origin: str) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=app_url, timeout=60, limits=limits) as client:
+        init = await client.post(
+            "/mcp/",
+            headers=MCP_HEADERS,
+            json={
+                "jsonrpc": "2.0",
+                "id": 0,
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": "2025-03-26",
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench", "version": "1"},
+                },
+            },
+        )
+        headers = {**MCP_HEADERS, "mcp-session-id": init.headers["mcp-session-id"]}
+        await client.post("/mcp/", headers=headers, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+        def tool_call(name: str, arguments: Dict[str, Any]) -> Callable[[int], Awaitable[None]]:
+            async def call(i: int) -> None:
+                resp = await client.post(
+                    "/mcp/",
+                    headers=headers,
+                    json={"jsonrpc": "2.0", "id": i + 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}},
+                )
+                resp.raise_for_status()
+
+            return call
+
+        return {
+            "hello.say": await run_concurrently(args.requests, args.concurrency, tool_call("hello.say", {})),
+            "wechat.article.fetch": await run_concurrently(
+                args.requests,
+                args.concurrency,
+                tool_call("wechat.article.fetch", {"url": f"{origin}/basic.html", "save_files": False, "use_cache": False}),
+            ),
+        }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> int:
+    """Print metrics that moved by more than ``threshold`` (fraction); return the regression count."""
+    regressions = 0
+
+    def walk(old: Any, new: Any, path: str) -> None:
+        nonlocal regressions
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key in sorted(set(old) & set(new)):
+                walk(old[key], new[key], f"{path}/{key}" if path else key)
+            return
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+            return
+        leaf = path.rsplit("/", 1)[-1]
+        if not (leaf.endswith("_ms") or leaf == "rps"):
+            return
+        change = (new - old) / old
+        worse = change < -threshold if leaf == "rps" else change > threshold
+        if abs(change) > threshold:
+            regressions += worse
+            print(f"{'REGRESSION' if worse else 'improved  '} {path}: {old} -> {new} ({change:+.0%})", file=sys.stderr)
+
+    walk(baseline.get("scenarios", {}), current.get("scenarios", {}), "")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ",".join(SCENARIOS))
+    parser.add_argument("--backend", default="auto", help="[wechat.extract].backend for the app scenarios")
+    parser.add_argument("--repeat", type=int, default=20, help="iterations per fixture for parse/fetch")
+    parser.add_argument("--requests", type=int, default=500, help="requests per throughput run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", type=Path, help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON to diff against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change reported by --compare")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "backend": args.backend,
+            "repeat": args.repeat,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+    if "parse" in selected:
+        results["scenarios"]["parse"] = scenario_parse(args)
+
+    app_scenarios = {"fetch": scenario_fetch, "call": scenario_call, "mcp": scenario_mcp}
+    if any(name in selected for name in app_scenarios):
+        with fixture_server() as origin, app_server(args.backend) as app_url:
+            for name, scenario in app_scenarios.items():
+                if name in selected:
+                    results["scenarios"][name] = asyncio.run(scenario(args, app_url, origin))
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        return 1 if compare(baseline, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
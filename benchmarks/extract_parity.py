@@ -0,0 +1,47 @@
+"""Check that every extract backend matches the bs4 reference on the fixture corpus.
+
+    python benchmarks/extract_parity.py [--backend lxml] [fixtures...]
+
+Exits non-zero and prints the first differing field per fixture on mismatch.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "src" / "providers" / "wechat" / "src")]
+
+from wechat.extract import get_extractor  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="lxml")
+    parser.add_argument("fixtures", nargs="*", type=Path)
+    args = parser.parse_args()
+
+    reference = get_extractor("bs4")
+    candidate = get_extractor(args.backend)
+    paths = args.fixtures or sorted(FIXTURES.glob("*.html"))
+    failures = 0
+    for path in paths:
+        html = path.read_text(encoding="utf-8")
+        expected = reference.extract(html)
+        actual = candidate.extract(html)
+        diff = [key for key in expected if expected[key] != actual.get(key)]
+        if diff:
+            failures += 1
+            key = diff[0]
+            print(f"FAIL {path.name}: {', '.join(diff)}")
+            print(f"  bs4:  {expected[key]!r:.200}")
+            print(f"  {candidate.name}: {actual.get(key)!r:.200}")
+        else:
+            print(f"ok   {path.name}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
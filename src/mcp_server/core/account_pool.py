@@ -0,0 +1,187 @@
+# wechat_mcp/core/account_pool.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from mcp_server.core.cookies import CookieManager
+from mcp_server.core.ratelimit import RateConfig, TokenBucket
+
+DEFAULT_ACCOUNT_RATE = RateConfig(rate=1.0, burst=2.0, cooldown_seconds=60.0, max_cooldown_seconds=1800.0)
+
+logger = logging.getLogger("wechat_mcp")
+
+
+class AccountsThrottled(RuntimeError):
+    """Every account of a platform is quarantined for longer than ``max_wait``."""
+
+    def __init__(self, platform: str, retry_after: float) -> None:
+        super().__init__(f"all {platform} accounts are quarantined; retry after {retry_after:.0f}s")
+        self.platform = platform
+        self.retry_after = retry_after
+
+
+class AccountsBusy(RuntimeError):
+    """Every usable account already has more than ``max_wait`` of requests queued on it."""
+
+    def __init__(self, platform: str, retry_after: float) -> None:
+        super().__init__(f"all {platform} accounts are busy; retry after {retry_after:.0f}s")
+        self.platform = platform
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class AccountLease:
+    platform: str
+    account: str
+    cookie: str
+
+
+class _AccountState:
+    def __init__(self, name: str, config: RateConfig) -> None:
+        self.name = name
+        self.bucket = TokenBucket(config)
+        self.requests = 0
+        self.blocked = 0
+        self.in_flight = 0
+        self.last_used = 0.0
+        self.started = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(1e-9, time.monotonic() - self.started)
+        return {
+            **self.bucket.snapshot(),
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "in_flight": self.in_flight,
+            "requests_per_minute": round(self.requests * 60.0 / elapsed, 3),
+        }
+
+
+class AccountPool:
+    """Rotates a platform's requests across all of its cookie accounts.
+
+    Each account is paced by its own token bucket (``[cookies.pool]``). A
+    verification wall penalizes only the account that hit it, quarantining it
+    for the bucket's growing cooldown while the others keep serving, so
+    throughput scales with the number of provisioned accounts. Accounts whose
+    cookie file is missing or unreadable are skipped; with none usable,
+    callers proceed anonymously. Cookie files are read on ``executor`` (the
+    context's tool executor), never on the event loop.
+    """
+
+    def __init__(
+        self,
+        cookies: CookieManager,
+        config: RateConfig = DEFAULT_ACCOUNT_RATE,
+        max_wait: float = 30.0,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.cookies = cookies
+        self.config = config
+        self.max_wait = max_wait
+        self.executor = executor
+        # (platform, account) pairs whose cookie file failed to load, logged once until fixed.
+        self._unreadable: Set[Tuple[str, str]] = set()
+        self._states: Dict[str, Dict[str, _AccountState]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_config(
+        config: Dict[str, Any], cookies: CookieManager, executor: Optional[Executor] = None
+    ) -> "AccountPool":
+        pool_cfg = config.get("cookies", {}).get("pool", {})
+        return AccountPool(
+            cookies,
+            config=RateConfig.from_dict(pool_cfg, base=DEFAULT_ACCOUNT_RATE),
+            max_wait=float(pool_cfg.get("max_wait_seconds", 30.0)),
+            executor=executor,
+        )
+
+    async def acquire(self, platform: str) -> Optional[AccountLease]:
+        """Lease the account that can serve soonest and wait for its turn.
+
+        Returns ``None`` when the platform has no usable account. Raises
+        ``AccountsThrottled`` when every usable account is quarantined for
+        longer than ``max_wait``, and ``AccountsBusy`` when they are merely
+        backed up that far with other requests.
+        """
+        usable = await asyncio.get_running_loop().run_in_executor(self.executor, self._usable, platform)
+        if not usable:
+            return None
+        cooldowns = [state.bucket.cooldown_remaining() for state, _ in usable]
+        if min(cooldowns) > self.max_wait:
+            raise AccountsThrottled(platform, min(cooldowns))
+
+        wait, _, _, _, state, cookie = min(
+            (state.bucket.wait_time(), state.in_flight, state.last_used, state.name, state, cookie)
+            for state, cookie in usable
+        )
+        if wait > self.max_wait:
+            raise AccountsBusy(platform, wait)
+        state.requests += 1
+        state.in_flight += 1
+        state.last_used = time.monotonic()
+        try:
+            await state.bucket.acquire()
+        except BaseException:
+            state.in_flight -= 1
+            raise
+        return AccountLease(platform=platform, account=state.name, cookie=cookie)
+
+    def _usable(self, platform: str) -> List[Tuple[_AccountState, str]]:
+        usable = []
+        for state in self._accounts(platform):
+            try:
+                record = self.cookies.get_cookie_record(platform, state.name)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as exc:
+                if (platform, state.name) not in self._unreadable:
+                    self._unreadable.add((platform, state.name))
+                    logger.warning("account %s/%s: unreadable cookie file skipped (%s)", platform, state.name, exc)
+                continue
+            self._unreadable.discard((platform, state.name))
+            if record.cookie:
+                usable.append((state, record.cookie))
+        return usable
+
+    def release(self, lease: AccountLease, blocked: bool) -> None:
+        state = self._states.get(lease.platform, {}).get(lease.account)
+        if state is None:
+            return
+        state.in_flight = max(0, state.in_flight - 1)
+        if blocked:
+            state.blocked += 1
+            state.bucket.penalize()
+        else:
+            state.bucket.reward()
+
+    def snapshot(self, platform: Optional[str] = None) -> Dict[str, Any]:
+        if platform is not None:
+            # Include accounts that have not served a request yet.
+            self._accounts(platform)
+        with self._lock:
+            platforms = {name: dict(states) for name, states in self._states.items()}
+        return {
+            name: {account: state.snapshot() for account, state in states.items()}
+            for name, states in platforms.items()
+            if platform is None or name == platform
+        }
+
+    def _accounts(self, platform: str) -> List[_AccountState]:
+        names = list(self.cookies.list_accounts(platform))
+        with self._lock:
+            known = self._states.setdefault(platform, {})
+            for name in names:
+                if name not in known:
+                    known[name] = _AccountState(name, self.config)
+            for name in set(known) - set(names):
+                del known[name]
+            return [known[name] for name in names]
+
@@ -0,0 +1,163 @@
+# wechat_mcp/core/admission.py
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from mcp_server.core.metrics import Metrics
+
+
+@dataclass(frozen=True)
+class LimitConfig:
+    # Calls of the tool running at once; 0 disables admission control.
+    max_concurrency: int = 0
+    # Calls allowed to wait for a slot; beyond that they fail fast with ``overloaded``.
+    max_queue: int = 0
+    # Shrink the limit (down to min_concurrency) when calls fail or run
+    # latency_tolerance times slower than usual; grow it back while healthy.
+    adaptive: bool = False
+    min_concurrency: int = 1
+    latency_tolerance: float = 2.0
+    backoff_factor: float = 0.9
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any], base: "LimitConfig | None" = None) -> "LimitConfig":
+        base = base or LimitConfig()
+        return LimitConfig(
+            max_concurrency=int(data.get("max_concurrency", base.max_concurrency)),
+            max_queue=int(data.get("max_queue", base.max_queue)),
+            adaptive=bool(data.get("adaptive", base.adaptive)),
+            min_concurrency=int(data.get("min_concurrency", base.min_concurrency)),
+            latency_tolerance=float(data.get("latency_tolerance", base.latency_tolerance)),
+            backoff_factor=float(data.get("backoff_factor", base.backoff_factor)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 0
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"too many calls waiting; retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Concurrency limit with a bounded FIFO queue and AIMD adaptation.
+
+    ``acquire`` takes a slot or waits for one; once ``max_queue`` callers are
+    already waiting it raises ``Overloaded`` instead, so latency under a
+    burst stays bounded. With ``adaptive`` set, ``release`` cuts the limit by
+    ``backoff_factor`` when a call failed or succeeded only after
+    ``latency_tolerance`` times the usual latency (at most once per wave of
+    calls started before the previous cut), and adds ``1/limit`` after each
+    healthy call that ran at full concurrency. Used from the event loop only.
+    """
+
+    # Healthy calls observed before latency can shrink the limit.
+    MIN_SAMPLES = 10
+
+    def __init__(self, config: LimitConfig, metrics: Optional[Metrics] = None, name: str = "") -> None:
+        self.config = config
+        self.metrics = metrics
+        self.name = name
+        self.limit = float(config.max_concurrency)
+        self.in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._baseline: Optional[float] = None
+        self._samples = 0
+        self._latency: Optional[float] = None
+        self._shrunk_at = 0.0
+        self._publish()
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the start time to pass to ``release``."""
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return time.monotonic()
+        if len(self._waiters) >= self.config.max_queue:
+            raise Overloaded(self.retry_after())
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._publish()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the caller gave up; pass it on.
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(future)
+                self._publish()
+            raise
+        return time.monotonic()
+
+    def release(self, started: float, healthy: Optional[bool]) -> None:
+        """Return a slot. ``healthy`` is ``None`` when the outcome says nothing about load
+        (cancelled, or failed for a reason of the caller's or the configuration's)."""
+        self.in_flight -= 1
+        self._adapt(started, time.monotonic() - started, healthy)
+        self._wake()
+
+    def retry_after(self) -> float:
+        """Rough time for the current queue to drain, in whole seconds (1-60)."""
+        latency = self._latency if self._latency is not None else 1.0
+        return float(min(60, max(1, math.ceil((self.queued + 1) * latency / self.capacity))))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 3),
+            "max_concurrency": self.config.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+    def _adapt(self, started: float, elapsed: float, healthy: Optional[bool]) -> None:
+        self._latency = elapsed if self._latency is None else 0.8 * self._latency + 0.2 * elapsed
+        if not self.config.adaptive:
+            return
+        slow = (
+            self._baseline is not None
+            and self._samples >= self.MIN_SAMPLES
+            and elapsed > self._baseline * self.config.latency_tolerance
+        )
+        if healthy:
+            # Slow calls feed the baseline too, so a lasting slowdown becomes the new normal;
+            # quick failures like a missing cookie would only drag it down.
+            self._baseline = elapsed if self._baseline is None else 0.95 * self._baseline + 0.05 * elapsed
+            self._samples += 1
+        # A slow call only counts when it succeeded; a cancelled or neutral outcome says nothing.
+        if healthy is False or (healthy and slow):
+            if started >= self._shrunk_at:
+                self.limit = max(float(self.config.min_concurrency), self.limit * self.config.backoff_factor)
+                self._shrunk_at = time.monotonic()
+        elif healthy and self.in_flight + 1 >= self.capacity:
+            self.limit = min(float(self.config.max_concurrency), self.limit + 1.0 / self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.capacity:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                self.in_flight += 1
+        self._publish()
+
+    def _publish(self) -> None:
+        if self.metrics is None:
+            return
+        self.metrics.set("mcp_tool_queued", self.queued, tool=self.name)
+        self.metrics.set("mcp_tool_concurrency_limit", self.capacity, tool=self.name)
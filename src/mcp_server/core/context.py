@@ -1,11 +1,16 @@
 ﻿# wechat_mcp/core/context.py
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import functools
 import logging
-import sqlite3
-from dataclasses import dataclass
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, TypeVar
 
 try:
     import tomllib  # Python 3.11+
@@ -16,7 +21,17 @@ except ModuleNotFoundError:  # pragma: no cover
     except ModuleNotFoundError:  # pragma: no cover
         tomllib = None  # type: ignore
 
-from mcp_server.core.http_client import HttpClient
+from mcp_server.core.account_pool import AccountPool
+from mcp_server.core.cookies import CookieManager
+from mcp_server.core.db import Database
+from mcp_server.core.http_client import HttpClient, HttpConfig
+from mcp_server.core.metrics import Metrics, record_phase, run_collecting_phases
+from mcp_server.core.ratelimit import RateLimiter
+from mcp_server.core.writer import FileWriter
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 32
 
 
 @dataclass
@@ -24,7 +39,20 @@ class AppContext:
     config: Dict[str, Any]
     http: HttpClient
     logger: logging.Logger
-    db: sqlite3.Connection
+    db: Database
+    executor: ThreadPoolExecutor
+    rate_limiter: RateLimiter
+    writer: FileWriter
+    cookies: CookieManager
+    accounts: AccountPool
+    metrics: Metrics
+    # Plugin-owned shared state (caches, pools), keyed by "<plugin>.<name>".
+    extensions: Dict[str, Any] = field(default_factory=dict)
+    # Processes for CPU-bound work (``run_cpu``); 0 keeps that work on ``executor``.
+    cpu_workers: int = 0
+    cpu_start_method: str = "spawn"
+    _cpu_pool: Optional[ProcessPoolExecutor] = field(default=None, init=False, repr=False)
+    _cpu_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     @staticmethod
     def from_config(config_path: Path) -> "AppContext":
@@ -37,14 +65,86 @@ class AppContext:
             logging.basicConfig(level=logging.INFO)
 
         db_path = AppContext._resolve_db_path(config, config_path)
-        db = sqlite3.connect(db_path)
-        http = HttpClient()
+        # Sync handlers run on executor threads; each thread gets its own WAL connection.
+        db = Database.from_config(config, db_path)
+        metrics = Metrics()
+        http = HttpClient(HttpConfig.from_config(config), metrics=metrics)
+        cookies = CookieManager(config, base_dir=AppContext._config_dir(config_path))
+
+        server_cfg = config.get("server", {})
+        executor = ThreadPoolExecutor(
+            max_workers=int(server_cfg.get("max_workers", DEFAULT_MAX_WORKERS)),
+            thread_name_prefix="mcp-tool",
+        )
+
+        return AppContext(
+            config=config,
+            http=http,
+            logger=logger,
+            db=db,
+            executor=executor,
+            rate_limiter=RateLimiter.from_config(config),
+            writer=FileWriter.from_config(config, logger),
+            cookies=cookies,
+            accounts=AccountPool.from_config(config, cookies, executor),
+            metrics=metrics,
+            cpu_workers=int(server_cfg.get("cpu_workers", 0)),
+            cpu_start_method=str(server_cfg.get("cpu_start_method", "spawn")),
+        )
+
+    async def run_sync(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run blocking ``func`` on the bounded tool executor without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
 
-        return AppContext(config=config, http=http, logger=logger, db=db)
+    async def run_cpu(self, func: Callable[..., T], *args: Any) -> T:
+        """Run CPU-bound ``func`` in the process pool, or on the thread pool when disabled.
+
+        With processes, ``func`` and its arguments must be picklable, and only
+        its return value comes back; phase timings recorded inside it are
+        replayed into the current call.
+        """
+        pool = self._cpu_executor()
+        if pool is None:
+            return await self.run_sync(func, *args)
+        loop = asyncio.get_running_loop()
+        result, phases = await loop.run_in_executor(pool, run_collecting_phases, func, *args)
+        for name, seconds in phases.items():
+            record_phase(name, seconds)
+        return result
+
+    def _cpu_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.cpu_workers <= 0:
+            return None
+        if self._cpu_pool is None:
+            with self._cpu_lock:
+                if self._cpu_pool is None:
+                    # Workers start on first use so startup stays fast. "spawn" avoids
+                    # forking a process that already runs threads.
+                    self._cpu_pool = ProcessPoolExecutor(
+                        max_workers=self.cpu_workers,
+                        mp_context=multiprocessing.get_context(self.cpu_start_method),
+                    )
+        return self._cpu_pool
+
+    async def aclose(self) -> None:
+        # Drain pending write-behind output before anything else goes away.
+        await asyncio.get_running_loop().run_in_executor(None, self.writer.close)
+        await self.http.aclose()
+        # Let in-flight blocking work (DB writes included) finish before the db closes.
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self.executor.shutdown, wait=True))
+        if self._cpu_pool is not None:
+            await loop.run_in_executor(None, functools.partial(self._cpu_pool.shutdown, wait=True))
+        self.db.close()
 
     @staticmethod
     def _resolve_db_path(config: Dict[str, Any], config_path: Path) -> str:
         db_config = config.get("database", {})
         path = db_config.get("sqlite_path", "./mcp_service.sqlite3")
-        base = config_path.parent if config_path.is_file() else Path(".")
-        return str((base / path).resolve())
+        return str((AppContext._config_dir(config_path) / path).resolve())
+
+    @staticmethod
+    def _config_dir(config_path: Path) -> Path:
+        return config_path.parent if config_path.is_file() else Path(".")
@@ -1,12 +1,17 @@
 # wechat_mcp/core/cookies.py
 from __future__ import annotations
 
+import errno
 import json
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mcp_server.core.writer import write_atomic
 
 try:
     from cryptography.fernet import Fernet, InvalidToken
@@ -23,7 +28,29 @@ class CookieRecord:
     encrypted: bool = False
 
 
+# (st_mtime_ns, st_size) of a file or directory when it was last read.
+_Stamp = Tuple[int, int]
+
+DEFAULT_CACHE_SIZE = 128
+
+
+def _stamp(path: Path) -> Optional[_Stamp]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 class CookieManager:
+    """File-backed cookie store with a process-local cache.
+
+    Decrypted records are kept in memory only, in a bounded LRU keyed by file
+    path. A ``stat`` per lookup detects edits made outside this process (the
+    record is re-read when mtime or size change); ``set_cookie`` replaces the
+    cached record directly.
+    """
+
     def __init__(self, config: Dict[str, Any], base_dir: str | Path = ".") -> None:
         self._config = config
         self._cookies_cfg = config.get("cookies", {})
@@ -42,12 +69,33 @@ class CookieManager:
             raise ModuleNotFoundError("cryptography is required for cookie encryption")
         self._fernet = Fernet(self._key) if self._key and Fernet is not None else None
 
+        self._cache_size = max(1, int(self._cookies_cfg.get("cache_size", DEFAULT_CACHE_SIZE)))
+        self._records: "OrderedDict[Path, Tuple[_Stamp, CookieRecord]]" = OrderedDict()
+        self._accounts: Dict[str, Tuple[Optional[_Stamp], List[str]]] = {}
+        # Account file locations depend only on config; resolve() costs several syscalls.
+        self._paths: Dict[Tuple[str, Optional[str]], Tuple[str, Path]] = {}
+        self._lock = threading.Lock()
+
     def get_cookie(self, platform: str, account: Optional[str] = None) -> str:
         record = self.get_cookie_record(platform, account)
         return record.cookie
 
     def get_cookie_record(self, platform: str, account: Optional[str] = None) -> CookieRecord:
         account, path = self._resolve_account_file(platform, account)
+        stamp = _stamp(path)
+        if stamp is None:
+            self._forget(path)
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+        with self._lock:
+            cached = self._records.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._records.move_to_end(path)
+                return cached[1]
+        record = self._load_record(account, path)
+        self._remember(path, stamp, record)
+        return record
+
+    def _load_record(self, account: str, path: Path) -> CookieRecord:
         data = self._read_json(path)
         cookie_value = data.get("cookie", "")
         encrypted = bool(data.get("encrypted", False))
@@ -71,7 +119,27 @@ class CookieManager:
             "encrypted": encrypted,
         }
         self._write_json(path, data)
-        return CookieRecord(name=account, cookie=cookie, updated_at=updated_at, encrypted=encrypted)
+        record = CookieRecord(name=account, cookie=cookie, updated_at=updated_at, encrypted=encrypted)
+        stamp = _stamp(path)
+        if stamp is not None:
+            self._remember(path, stamp, record)
+        with self._lock:
+            self._accounts.pop(platform, None)
+        return record
+
+    def invalidate(self, platform: Optional[str] = None, account: Optional[str] = None) -> None:
+        """Drop cached records: one account, one platform, or everything."""
+        with self._lock:
+            if platform is None:
+                self._records.clear()
+                self._accounts.clear()
+                return
+            self._accounts.pop(platform, None)
+        if account is not None:
+            self._forget(self._resolve_account_file(platform, account)[1])
+        else:
+            for name in self.list_accounts(platform):
+                self._forget(self._resolve_account_file(platform, name)[1])
 
     def list_accounts(self, platform: str) -> Iterable[str]:
         platform_cfg = self._platform_cfg(platform)
@@ -79,11 +147,36 @@ class CookieManager:
         if accounts_cfg:
             return list(accounts_cfg.keys())
         platform_dir = self._base_path / platform
-        if not platform_dir.exists():
-            return []
-        return sorted(p.stem for p in platform_dir.glob("*.json"))
+        # Adding or removing a file bumps the directory mtime.
+        stamp = _stamp(platform_dir)
+        with self._lock:
+            cached = self._accounts.get(platform)
+            if cached is not None and cached[0] == stamp:
+                return list(cached[1])
+        names = sorted(p.stem for p in platform_dir.glob("*.json")) if stamp is not None else []
+        with self._lock:
+            self._accounts[platform] = (stamp, names)
+        return list(names)
+
+    def _remember(self, path: Path, stamp: _Stamp, record: CookieRecord) -> None:
+        with self._lock:
+            self._records[path] = (stamp, record)
+            self._records.move_to_end(path)
+            while len(self._records) > self._cache_size:
+                self._records.popitem(last=False)
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            self._records.pop(path, None)
 
     def _resolve_account_file(self, platform: str, account: Optional[str]) -> Tuple[str, Path]:
+        key = (platform, account)
+        resolved = self._paths.get(key)
+        if resolved is None:
+            resolved = self._paths[key] = self._locate_account_file(platform, account)
+        return resolved
+
+    def _locate_account_file(self, platform: str, account: Optional[str]) -> Tuple[str, Path]:
         platform_cfg = self._platform_cfg(platform)
         if account is None:
             account = platform_cfg.get("default_account", "default") if platform_cfg else "default"
@@ -131,5 +224,5 @@ class CookieManager:
     @staticmethod
     def _write_json(path: Path, data: Dict[str, Any]) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, ensure_ascii=False, indent=2)
+        # Atomic replace so a concurrent reader never sees a half-written file.
+        write_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
@@ -0,0 +1,159 @@
+# wechat_mcp/core/db.py
+from __future__ import annotations
+
+import itertools
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    # Negative cache_size is in KiB: 16 MiB of page cache per connection.
+    "cache_size": -16000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "memory",
+    "foreign_keys": "on",
+}
+
+
+def _identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"invalid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+
+class Database:
+    """SQLite facade handing each thread its own connection.
+
+    Tools run on many executor threads; sharing one connection would either
+    trip the same-thread check or serialize every query. Connections open in
+    autocommit mode with WAL and the configured pragmas, so readers never block
+    the writer; use ``transaction()`` to group writes atomically.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pragmas: Optional[Dict[str, Any]] = None,
+        cached_statements: int = 256,
+        timeout: float = 5.0,
+    ) -> None:
+        self.path = path
+        self._pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        for name, value in self._pragmas.items():
+            _identifier(name)
+            if not _PRAGMA_VALUE.match(str(value)):
+                raise ValueError(f"invalid value for pragma {name}: {value!r}")
+        self._cached_statements = cached_statements
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def from_config(config: Dict[str, Any], path: str) -> "Database":
+        db_cfg = config.get("database", {})
+        return Database(
+            path,
+            pragmas=db_cfg.get("pragmas", {}),
+            cached_statements=int(db_cfg.get("cached_statements", 256)),
+            timeout=float(db_cfg.get("timeout", 5.0)),
+        )
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        return self.connection().executemany(sql, rows)
+
+    def executescript(self, script: str) -> None:
+        self.connection().executescript(script)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block in one write transaction, rolled back if it raises.
+
+        ``BEGIN IMMEDIATE`` takes the write lock up front, so read-then-write
+        blocks cannot deadlock against another writer.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction.
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def bulk_insert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        on_conflict: str = "",
+        chunk_size: int = 500,
+    ) -> int:
+        """Insert ``rows`` with one prepared statement inside a single transaction.
+
+        ``on_conflict`` is ``""``, ``"replace"`` or ``"ignore"``. Returns the
+        number of rows submitted.
+        """
+        verb = {"": "INSERT", "replace": "INSERT OR REPLACE", "ignore": "INSERT OR IGNORE"}[on_conflict]
+        sql = (
+            f"{verb} INTO {_identifier(table)} ({', '.join(_identifier(c) for c in columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+        total = 0
+        iterator = iter(rows)
+        with self.transaction() as conn:
+            while True:
+                chunk = list(itertools.islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                conn.executemany(sql, chunk)
+                total += len(chunk)
+        return total
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("database is closed")
+            # check_same_thread is off only so close() can run from the shutdown thread.
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self._timeout,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=self._cached_statements,
+            )
+            for name, value in self._pragmas.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+            self._connections.append(conn)
+            return conn
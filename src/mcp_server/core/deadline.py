@@ -0,0 +1,52 @@
+# wechat_mcp/core/deadline.py
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Absolute ``time.monotonic()`` by which the current tool call must finish.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("mcp_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Bound the enclosed work to ``seconds`` from now; ``None`` keeps the current deadline.
+
+    Scopes only ever tighten: an inner scope cannot outlive the outer one.
+    The deadline follows ``ctx.run_sync`` onto executor threads and is read
+    by ``HttpClient`` to cap request timeouts.
+    """
+    current = _deadline.get()
+    if seconds is None:
+        yield current
+        return
+    deadline = time.monotonic() + seconds
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check() -> Optional[float]:
+    """Like ``remaining`` but raise ``DeadlineExceeded`` once it has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+    return left
@@ -1,4 +1,4 @@
-# wechat_mcp/core/errors.py
+﻿# wechat_mcp/core/errors.py
 ERROR_INVALID_INPUT = {
     "code": "invalid_input",
     "message": "Invalid input",
@@ -24,3 +24,18 @@ ERROR_COOKIE_NOT_FOUND = {
     "message": "Cookie not found",
     "hint": "Check platform/account and cookie storage",
 }
+ERROR_ACCOUNTS_THROTTLED = {
+    "code": "accounts_throttled",
+    "message": "All accounts are quarantined",
+    "hint": "Retry later or provision more accounts",
+}
+ERROR_DEADLINE_EXCEEDED = {
+    "code": "deadline_exceeded",
+    "message": "Deadline exceeded",
+    "hint": "Raise options.timeout_ms or retry later",
+}
+ERROR_OVERLOADED = {
+    "code": "overloaded",
+    "message": "Too many calls in progress",
+    "hint": "Retry after error.retry_after seconds",
+}
@@ -0,0 +1,77 @@
+# wechat_mcp/core/hedging.py
+from __future__ import annotations
+
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to send a backup request and how to retry failed ones.
+
+    A hedge is sent when the first attempt has not answered within the
+    ``percentile`` latency observed for the host (clamped to
+    ``min_delay``/``max_delay``; ``max_delay`` until ``min_samples`` are
+    known). Transport errors and ``retry_statuses`` are retried up to
+    ``retries`` times with full-jitter exponential backoff.
+    """
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.05
+    max_delay: float = 5.0
+    max_hedges: int = 1
+    retries: int = 2
+    backoff_base: float = 0.2
+    backoff_max: float = 2.0
+    retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "HedgePolicy":
+        base = HedgePolicy()
+        return HedgePolicy(
+            percentile=float(data.get("percentile", base.percentile)),
+            min_samples=int(data.get("min_samples", base.min_samples)),
+            min_delay=float(data.get("min_delay", base.min_delay)),
+            max_delay=float(data.get("max_delay", base.max_delay)),
+            max_hedges=int(data.get("max_hedges", base.max_hedges)),
+            retries=int(data.get("retries", base.retries)),
+            backoff_base=float(data.get("backoff_base", base.backoff_base)),
+            backoff_max=float(data.get("backoff_max", base.backoff_max)),
+            retry_statuses=tuple(int(code) for code in data.get("retry_statuses", base.retry_statuses)),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+
+
+class LatencyTracker:
+    """Recent response latencies per host, for percentile-based hedge delays."""
+
+    def __init__(self, window: int = 256) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[index]
+
+    def hedge_delay(self, key: str, policy: HedgePolicy) -> float:
+        observed = self.percentile(key, policy.percentile, policy.min_samples)
+        delay = policy.max_delay if observed is None else observed
+        return min(policy.max_delay, max(policy.min_delay, delay))
@@ -1,13 +1,351 @@
 ﻿# wechat_mcp/core/http_client.py
-import requests
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+from mcp_server.core import deadline
+from mcp_server.core.hedging import HedgePolicy, LatencyTracker
+from mcp_server.core.metrics import Metrics
+
+try:
+    import h2  # noqa: F401  # required by httpx for HTTP/2
+except ModuleNotFoundError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+try:
+    from charset_normalizer import from_bytes as _detect_charset
+except ModuleNotFoundError:  # pragma: no cover
+    _detect_charset = None  # type: ignore
+
+
+DEFAULT_POOL = "*"
+
+
+def _default_encoding(content: bytes) -> str:
+    # Only consulted when the response carries no charset in Content-Type.
+    if _detect_charset is None:
+        return "utf-8"
+    best = _detect_charset(content).best()
+    return best.encoding if best is not None else "utf-8"
+
+
+def _cap(value: Optional[float], limit: float) -> float:
+    return limit if value is None else min(value, limit)
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any], base: "PoolConfig | None" = None) -> "PoolConfig":
+        base = base or PoolConfig()
+        return PoolConfig(
+            max_connections=int(data.get("max_connections", base.max_connections)),
+            max_keepalive_connections=int(
+                data.get("max_keepalive_connections", base.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(data.get("keepalive_expiry", base.keepalive_expiry)),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+@dataclass(frozen=True)
+class HttpConfig:
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 5.0
+    http2: bool = True
+    pool: PoolConfig = field(default_factory=PoolConfig)
+    hosts: Dict[str, PoolConfig] = field(default_factory=dict)
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "HttpConfig":
+        http_cfg = config.get("http", {})
+        pool = PoolConfig.from_dict(http_cfg)
+        hosts = {
+            host.lower(): PoolConfig.from_dict(host_cfg, base=pool)
+            for host, host_cfg in http_cfg.get("hosts", {}).items()
+        }
+        return HttpConfig(
+            connect_timeout=float(http_cfg.get("connect_timeout", 5.0)),
+            read_timeout=float(http_cfg.get("read_timeout", 30.0)),
+            write_timeout=float(http_cfg.get("write_timeout", 30.0)),
+            pool_timeout=float(http_cfg.get("pool_timeout", 5.0)),
+            http2=bool(http_cfg.get("http2", True)),
+            pool=pool,
+            hosts=hosts,
+        )
+
+    def timeout(self, read: Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout if read is None else read,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
 
 
 class HttpClient:
-    def __init__(self) -> None:
-        self.session = requests.Session()
+    """Pooled HTTP client with a sync facade and an async API.
+
+    Hosts listed under ``[http.hosts]`` get a dedicated connection pool;
+    every other host shares the default one. Clients are created lazily,
+    so a worker that only ever uses the async API never opens a sync pool.
+
+    Every request's timeouts are capped by the current tool call's deadline
+    (``mcp_server.core.deadline``). Async requests given a ``hedge`` policy
+    are hedged and retried (see ``HedgePolicy``).
+    """
+
+    def __init__(self, config: HttpConfig | None = None, metrics: Optional[Metrics] = None) -> None:
+        self.config = config or HttpConfig()
+        self.metrics = metrics
+        self.latency = LatencyTracker()
+        self._http2 = self.config.http2 and HTTP2_AVAILABLE
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+
+    # -- sync facade -------------------------------------------------------
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self._client_for(url)
+        return client.request(method, url, **self._prepare(kwargs))
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    # -- async API ---------------------------------------------------------
+
+    async def arequest(
+        self, method: str, url: str, hedge: Optional[HedgePolicy] = None, **kwargs
+    ) -> httpx.Response:
+        if hedge is not None:
+            response = await self._send_hedged(method, url, hedge, kwargs)
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            return response
+        client = self._async_client_for(url)
+        return await client.request(method, url, **self._prepare(kwargs))
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("POST", url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def astream(
+        self, method: str, url: str, hedge: Optional[HedgePolicy] = None, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Send a request without reading the body; iterate ``response.aiter_bytes()``.
+
+        With ``hedge``, the race is on time to response headers: the body is
+        read only from the winning attempt.
+        """
+        if hedge is not None:
+            response = await self._send_hedged(method, url, hedge, kwargs)
+            try:
+                yield response
+            finally:
+                await response.aclose()
+            return
+        client = self._async_client_for(url)
+        async with client.stream(method, url, **self._prepare(kwargs)) as response:
+            yield response
+
+    # -- hedging -----------------------------------------------------------
+
+    async def _send_hedged(
+        self, method: str, url: str, policy: HedgePolicy, kwargs: Dict[str, Any]
+    ) -> httpx.Response:
+        """Return the first usable response, still open; retry failures with jittered backoff."""
+        client = self._async_client_for(url)
+        host = (urlsplit(url).hostname or "").lower()
+        attempt = 0
+        while True:
+            # Prepared per attempt so timeouts shrink with the remaining deadline.
+            prepared = self._prepare(dict(kwargs))
+            follow = prepared.pop("follow_redirects", None)
+            send_kwargs = {} if follow is None else {"follow_redirects": follow}
+
+            def build(prepared: Dict[str, Any] = prepared) -> httpx.Request:
+                return client.build_request(method, url, **prepared)
+
+            delay = policy.backoff(attempt)
+            left = deadline.remaining()
+            can_retry = attempt < policy.retries and (left is None or left > delay)
+            try:
+                response = await self._race(client, build, send_kwargs, policy, host)
+            except httpx.TransportError:
+                if not can_retry:
+                    raise
+            else:
+                if response.status_code not in policy.retry_statuses or not can_retry:
+                    return response
+                await response.aclose()
+            attempt += 1
+            self._count("mcp_http_retries_total", host)
+            await asyncio.sleep(delay)
+
+    async def _race(
+        self,
+        client: httpx.AsyncClient,
+        build: Callable[[], httpx.Request],
+        send_kwargs: Dict[str, Any],
+        policy: HedgePolicy,
+        host: str,
+    ) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        delay = self.latency.hedge_delay(host, policy)
+        started = loop.time()
+
+        async def send() -> httpx.Response:
+            sent = loop.time()
+            try:
+                response = await client.send(build(), stream=True, **send_kwargs)
+            except asyncio.CancelledError:
+                # A hedged-away attempt was at least this slow; keep the percentile honest.
+                self.latency.observe(host, loop.time() - sent)
+                raise
+            self.latency.observe(host, loop.time() - sent)
+            return response
+
+        pending: Set["asyncio.Future[httpx.Response]"] = {asyncio.ensure_future(send())}
+        launched = 1
+        winner: Optional[httpx.Response] = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None
+                if launched <= policy.max_hedges:
+                    timeout = max(0.0, started + delay * launched - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    pending.add(asyncio.ensure_future(send()))
+                    launched += 1
+                    self._count("mcp_http_hedges_total", host)
+                    continue
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task.result()
+                    else:
+                        await task.result().aclose()
+                if winner is not None:
+                    return winner
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, httpx.Response):
+                    await result.aclose()
+
+    def _count(self, name: str, host: str) -> None:
+        if self.metrics is not None:
+            self.metrics.inc(name, host=host)
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = list(self._async_clients.values())
+            self._async_clients.clear()
+        for client in clients:
+            await client.aclose()
+        self.close()
+
+    # -- internals ---------------------------------------------------------
+
+    def _prepare(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # Keep the requests-style ``timeout=<seconds>`` call sites working:
+        # a bare number overrides the read timeout, connect stays as configured.
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, (int, float)):
+            kwargs["timeout"] = self.config.timeout(read=float(timeout))
+        left = deadline.check()
+        if left is not None:
+            base = kwargs.get("timeout") or self.config.timeout()
+            if not isinstance(base, httpx.Timeout):
+                base = httpx.Timeout(base)
+            kwargs["timeout"] = httpx.Timeout(
+                connect=_cap(base.connect, left),
+                read=_cap(base.read, left),
+                write=_cap(base.write, left),
+                pool=_cap(base.pool, left),
+            )
+        if "allow_redirects" in kwargs:
+            kwargs["follow_redirects"] = kwargs.pop("allow_redirects")
+        return kwargs
+
+    def _pool_key(self, url: str) -> str:
+        host = (urlsplit(url).hostname or "").lower()
+        return host if host in self.config.hosts else DEFAULT_POOL
+
+    def _pool_config(self, key: str) -> PoolConfig:
+        return self.config.hosts.get(key, self.config.pool)
+
+    def _client_for(self, url: str) -> httpx.Client:
+        key = self._pool_key(url)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = httpx.Client(**self._client_kwargs(key))
+                    self._clients[key] = client
+        return client
 
-    def get(self, url: str, **kwargs):
-        return self.session.get(url, **kwargs)
+    def _async_client_for(self, url: str) -> httpx.AsyncClient:
+        key = self._pool_key(url)
+        client = self._async_clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._async_clients.get(key)
+                if client is None:
+                    client = httpx.AsyncClient(**self._client_kwargs(key))
+                    self._async_clients[key] = client
+        return client
 
-    def post(self, url: str, **kwargs):
-        return self.session.post(url, **kwargs)
+    def _client_kwargs(self, key: str) -> Dict[str, Any]:
+        return {
+            "http2": self._http2,
+            "limits": self._pool_config(key).limits(),
+            "timeout": self.config.timeout(),
+            "follow_redirects": True,
+            "default_encoding": _default_encoding,
+        }
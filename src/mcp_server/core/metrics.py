@@ -0,0 +1,198 @@
+# wechat_mcp/core/metrics.py
+from __future__ import annotations
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; wide enough for a cached hit (sub-ms) through a slow upstream (a minute).
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_HELP = {
+    "mcp_tool_calls_total": ("counter", "Tool invocations by outcome."),
+    "mcp_tool_errors_total": ("counter", "Failed tool invocations by error code."),
+    "mcp_tool_in_flight": ("gauge", "Tool invocations currently running."),
+    "mcp_tool_coalesced_total": ("counter", "Tool invocations served by another identical call."),
+    "mcp_tool_rejected_total": ("counter", "Tool invocations refused because the tool's queue was full."),
+    "mcp_tool_queued": ("gauge", "Tool invocations waiting for a concurrency slot."),
+    "mcp_tool_concurrency_limit": ("gauge", "Current (adaptive) concurrency limit per tool."),
+    "mcp_tool_duration_seconds": ("histogram", "Tool invocation latency."),
+    "mcp_tool_phase_seconds": ("histogram", "Time spent in each phase of a tool invocation."),
+    "mcp_http_hedges_total": ("counter", "Backup requests sent because the first one was slow."),
+    "mcp_http_retries_total": ("counter", "Upstream requests retried after an error status or transport failure."),
+}
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """In-process counters, gauges and histograms rendered as Prometheus text."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(sorted(buckets))
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._values):
+                self._header(lines, name)
+                for labels, value in sorted(self._values[name].items()):
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            for name in sorted(self._histograms):
+                self._header(lines, name)
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == math.inf else _number(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+                    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _header(lines: List[str], name: str) -> None:
+        kind, text = _HELP.get(name, ("untyped", ""))
+        if text:
+            lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+@dataclass
+class CallTimer:
+    """Timing state for one tool invocation, reachable from any code it runs."""
+
+    tool: str
+    metrics: Metrics
+    # Only filled when the caller asked for per-call timings.
+    phases: Optional[Dict[str, float]] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.metrics.observe("mcp_tool_phase_seconds", seconds, tool=self.tool, phase=name)
+        if self.phases is not None:
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+@dataclass
+class _Frame:
+    child: float = 0.0
+
+
+_current_call: contextvars.ContextVar[Optional[CallTimer]] = contextvars.ContextVar("mcp_call_timer", default=None)
+_current_frame: contextvars.ContextVar[Optional[_Frame]] = contextvars.ContextVar("mcp_phase_frame", default=None)
+
+
+@contextmanager
+def track_call(timer: CallTimer) -> Iterator[CallTimer]:
+    token = _current_call.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_call.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block as phase ``name`` of the current tool call.
+
+    Nested phases are exclusive: the outer phase is charged only for time not
+    spent in inner ones. Outside a tool call this is a no-op, so library code
+    (extractors, renderers) can be instrumented unconditionally. The call
+    context follows ``ctx.run_sync`` onto executor threads.
+    """
+    timer = _current_call.get()
+    if timer is None:
+        yield
+        return
+    parent = _current_frame.get()
+    frame = _Frame()
+    token = _current_frame.set(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_frame.reset(token)
+        if parent is not None:
+            parent.child += elapsed
+        timer.add_phase(name, max(0.0, elapsed - frame.child))
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """Charge an already-measured phase to the current call (and its enclosing phase)."""
+    timer = _current_call.get()
+    if timer is None:
+        return
+    parent = _current_frame.get()
+    if parent is not None:
+        parent.child += seconds
+    timer.add_phase(name, seconds)
+
+
+def run_collecting_phases(func: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, float]]:
+    """Run ``func`` under a private timer and return ``(result, phases)``.
+
+    Used in worker processes, where the caller's context is not available; the
+    caller replays the phases with ``record_phase``.
+    """
+    timer = CallTimer("worker", Metrics(), phases={})
+    with track_call(timer):
+        result = func(*args)
+    return result, timer.phases or {}
@@ -0,0 +1,183 @@
+# wechat_mcp/core/ratelimit.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass(frozen=True)
+class RateConfig:
+    # Requests per second; 0 disables limiting for the host.
+    rate: float = 0.0
+    burst: float = 1.0
+    # Adaptive backoff when the upstream pushes back (e.g. a verification wall).
+    backoff_factor: float = 0.5
+    min_rate: float = 0.05
+    recovery: float = 0.1
+    cooldown_seconds: float = 30.0
+    max_cooldown_seconds: float = 600.0
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any], base: "RateConfig | None" = None) -> "RateConfig":
+        base = base or RateConfig()
+        return RateConfig(
+            rate=float(data.get("rate", base.rate)),
+            burst=float(data.get("burst", base.burst)),
+            backoff_factor=float(data.get("backoff_factor", base.backoff_factor)),
+            min_rate=float(data.get("min_rate", base.min_rate)),
+            recovery=float(data.get("recovery", base.recovery)),
+            cooldown_seconds=float(data.get("cooldown_seconds", base.cooldown_seconds)),
+            max_cooldown_seconds=float(data.get("max_cooldown_seconds", base.max_cooldown_seconds)),
+        )
+
+
+class TokenBucket:
+    """Token bucket with AIMD-style adaptation.
+
+    ``acquire`` reserves a token and sleeps until it is due, so concurrent
+    callers are spaced out instead of racing. ``penalize`` cuts the rate and
+    pauses the bucket for an exponentially growing cooldown; each ``reward``
+    recovers a fraction of the configured rate.
+    """
+
+    def __init__(self, config: RateConfig) -> None:
+        self.config = config
+        self.rate = config.rate
+        self._capacity = max(1.0, config.burst)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.rate > 0
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            # Tokens only accrue once a cooldown has ended.
+            delay = max(0.0, self._blocked_until - now)
+            if self._tokens < 0:
+                delay += -self._tokens / self.rate
+            return delay
+
+    def wait_time(self) -> float:
+        """How long ``reserve`` would make the caller wait, without taking a token."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            delay = max(0.0, self._blocked_until - now)
+            if self._tokens < 1.0:
+                delay += (1.0 - self._tokens) / self.rate
+            return delay
+
+    def cooldown_remaining(self) -> float:
+        """Seconds left of the quarantine imposed by ``penalize`` (0 when not penalized)."""
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def penalize(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._strikes += 1
+            self.rate = max(self.config.min_rate, self.rate * self.config.backoff_factor)
+            cooldown = min(
+                self.config.max_cooldown_seconds,
+                self.config.cooldown_seconds * 2 ** (self._strikes - 1),
+            )
+            self._blocked_until = max(self._blocked_until, now + cooldown)
+            self._tokens = min(self._tokens, 0.0)
+
+    def reward(self) -> None:
+        if not self.enabled or (self._strikes == 0 and self.rate >= self.config.rate):
+            return
+        with self._lock:
+            self._strikes = 0
+            self.rate = min(self.config.rate, self.rate + self.config.rate * self.config.recovery)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "rate": round(self.rate, 4),
+                "configured_rate": self.config.rate,
+                "strikes": self._strikes,
+                "cooldown_remaining": round(max(0.0, self._blocked_until - now), 3),
+            }
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._blocked_until)
+        if now > start:
+            self._tokens = min(self._capacity, self._tokens + (now - start) * self.rate)
+        self._updated = max(self._updated, now)
+
+
+@dataclass
+class RateLimiter:
+    """Per-host token buckets configured from the ``[rate_limit]`` section."""
+
+    default: RateConfig = field(default_factory=RateConfig)
+    hosts: Dict[str, RateConfig] = field(default_factory=dict)
+    _buckets: Dict[str, TokenBucket] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "RateLimiter":
+        rate_cfg = config.get("rate_limit", {})
+        default = RateConfig.from_dict(rate_cfg)
+        hosts = {
+            host.lower(): RateConfig.from_dict(host_cfg, base=default)
+            for host, host_cfg in rate_cfg.get("hosts", {}).items()
+        }
+        return RateLimiter(default=default, hosts=hosts)
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = (urlsplit(url).hostname or "").lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    bucket = TokenBucket(self.hosts.get(host, self.default))
+                    self._buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str) -> None:
+        await self.bucket(url).acquire()
+
+    def report(self, url: str, blocked: bool) -> None:
+        bucket = self.bucket(url)
+        if blocked:
+            bucket.penalize()
+        else:
+            bucket.reward()
+
+    def snapshot(self, host: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {
+            name: bucket.snapshot()
+            for name, bucket in buckets.items()
+            if bucket.enabled and (host is None or name == host)
+        }
@@ -1,14 +1,54 @@
 ﻿# wechat_mcp/core/registry.py
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Callable, Dict
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import importlib
+import inspect
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from mcp_server.core.errors import ERROR_TOOL_NOT_FOUND, ERROR_TOOL_EXECUTION
-from mcp_server.core.response import ok, fail_error
+from mcp_server.core.admission import ConcurrencyLimiter, LimitConfig, Overloaded
+from mcp_server.core.deadline import deadline_scope, remaining
+from mcp_server.core.errors import (
+    ERROR_DEADLINE_EXCEEDED,
+    ERROR_INVALID_INPUT,
+    ERROR_OVERLOADED,
+    ERROR_TOOL_EXECUTION,
+    ERROR_TOOL_NOT_FOUND,
+)
+from mcp_server.core.metrics import CallTimer, Metrics, phase, record_phase, track_call
+from mcp_server.core.response import ok, fail_error, overloaded, project
+from mcp_server.core.schema import CompiledSchema, SchemaError, compile_schema
 
 
-Handler = Callable[["AppContext", Dict[str, Any]], Any]
+# Handlers may be plain functions or ``async def`` coroutines. Sync handlers
+# are run on the context's bounded executor so they never block the loop.
+Handler = Callable[["AppContext", Dict[str, Any]], Union[Any, Awaitable[Any]]]
+# Stream handlers are async generators yielding JSON-able chunks. Yielding a
+# failed ``fail_error`` envelope ends the stream with that error.
+StreamHandler = Callable[["AppContext", Dict[str, Any]], AsyncIterator[Any]]
+
+logger = logging.getLogger("wechat_mcp")
+
+# Failures that mean the tool or its upstream is struggling (timeouts, network
+# errors and 5xx surface as ``tool_error``); only these shrink an adaptive
+# limit. Caller mistakes, missing cookies and throttled accounts say nothing
+# about how much concurrency the upstream can take.
+_UNHEALTHY_ERRORS = {ERROR_TOOL_EXECUTION["code"], ERROR_DEADLINE_EXCEEDED["code"], ERROR_OVERLOADED["code"]}
+
+
+def import_handler(ref: str) -> Handler:
+    """Resolve a ``"package.module:function"`` reference."""
+    module_name, _, attr = ref.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Handler reference must look like 'module:function', got {ref!r}")
+    return getattr(importlib.import_module(module_name), attr)
 
 
 @dataclass
@@ -16,29 +56,460 @@ class MCPTool:
     name: str
     description: str
     input_schema: Dict[str, Any]
-    handler: Handler
+    # A callable, or a "module:function" string imported on the first call so
+    # listing tools never pays for handler imports.
+    handler: Union[Handler, str]
+    # Optional incremental variant used by ``ToolRegistry.stream``; same forms as ``handler``.
+    stream_handler: Optional[Union[StreamHandler, str]] = None
+    # Single-flight: concurrent calls with an identical payload share one
+    # execution, and a successful result is reused for ``coalesce_window``
+    # seconds after it lands. Only for tools whose result depends on the
+    # payload alone.
+    coalesce: bool = False
+    coalesce_window: float = 0.0
+    # Payload key that, when false, asks for a fresh result (e.g. ``use_cache``):
+    # such calls never get a ``coalesce_window`` result, though they still join
+    # an execution already in flight.
+    cache_flag: Optional[str] = None
+    # Admission control: how many calls may run and wait at once, optionally
+    # adaptive. ``[server.limits."<tool name>"]`` overrides it per deployment.
+    limits: Optional[LimitConfig] = None
+    _resolved: Optional[Handler] = field(default=None, init=False, repr=False, compare=False)
+    _stream_resolved: Optional[StreamHandler] = field(default=None, init=False, repr=False, compare=False)
+
+    def resolve(self) -> Handler:
+        if self._resolved is None:
+            self._resolved = self._import(self.handler)
+        return self._resolved
+
+    def resolve_stream(self) -> StreamHandler:
+        if self._stream_resolved is None:
+            if self.stream_handler is None:
+                raise LookupError(f"Tool {self.name} has no stream handler")
+            self._stream_resolved = self._import(self.stream_handler)
+        return self._stream_resolved
+
+    def _import(self, ref: Union[Callable[..., Any], str]) -> Any:
+        if not isinstance(ref, str):
+            return ref
+        start = time.perf_counter()
+        resolved = import_handler(ref)
+        logger.info("tool %s: imported %s in %.1f ms", self.name, ref, (time.perf_counter() - start) * 1000)
+        return resolved
+
+    @property
+    def loaded(self) -> bool:
+        return self._resolved is not None or not isinstance(self.handler, str)
+
+    @property
+    def streams(self) -> bool:
+        return self.stream_handler is not None
+
+
+@dataclass
+class CallOptions:
+    """Per-call switches sent alongside the tool input (``options`` in ``/call``)."""
+
+    # Attach ``meta.timings`` (total and per-phase milliseconds) to the response.
+    timings: bool = False
+    # Dotted paths into ``data`` to keep, e.g. ``["data.title", "data.content_markdown"]``;
+    # ``None`` returns everything. Lists are projected per element.
+    fields: Optional[List[str]] = None
+    # Overall budget for the call in milliseconds; overrides the registry default.
+    timeout_ms: Optional[int] = None
+
+
+FlightKey = Tuple[str, str]
+# A coalesced execution's response and the phases it spent, for every caller to replay.
+FlightResult = Tuple[Dict[str, Any], Dict[str, float]]
+
+
+@dataclass
+class _Flight:
+    task: "asyncio.Task[FlightResult]"
+    waiters: int = 0
 
 
 class ToolRegistry:
-    def __init__(self) -> None:
+    # Upper bound on results kept for ``coalesce_window`` reuse.
+    MAX_SHARED_RESULTS = 1024
+
+    def __init__(
+        self,
+        default_timeout: Optional[float] = None,
+        limits: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        # Seconds; calls without ``options.timeout_ms`` get this budget (``None``: unbounded).
+        self.default_timeout = default_timeout
+        # ``[server.limits]``: per-tool overrides of ``MCPTool.limits``.
+        self.limit_overrides = limits or {}
         self.tools: Dict[str, MCPTool] = {}
+        self._schemas: Dict[str, CompiledSchema] = {}
+        self._limits: Dict[str, LimitConfig] = {}
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+        self._flights: Dict[FlightKey, _Flight] = {}
+        self._shared: Dict[FlightKey, Tuple[float, Dict[str, Any]]] = {}
+        # Min-heap of ``(expires, key)`` so expired results are dropped as soon as they lapse.
+        self._expiries: List[Tuple[float, FlightKey]] = []
 
     def register(self, tool: MCPTool) -> None:
         if tool.name in self.tools:
             raise ValueError(f"Tool already registered: {tool.name}")
+        try:
+            compiled = compile_schema(tool.input_schema)
+        except TypeError as exc:
+            raise ValueError(f"Invalid input_schema for {tool.name}: {exc}") from exc
         self.tools[tool.name] = tool
+        self._schemas[tool.name] = compiled
+        limits = LimitConfig.from_dict(self.limit_overrides.get(tool.name, {}), base=tool.limits)
+        if limits.enabled:
+            self._limits[tool.name] = limits
+
+    def limiter(self, name: str, ctx: "AppContext") -> Optional[ConcurrencyLimiter]:
+        """The tool's admission limiter, or ``None`` when it runs unbounded."""
+        limiter = self._limiters.get(name)
+        if limiter is None and name in self._limits:
+            limiter = self._limiters[name] = ConcurrencyLimiter(self._limits[name], ctx.metrics, name)
+        return limiter
+
+    def schema(self, name: str) -> Dict[str, Any]:
+        """The schema ``invoke`` validates against, as published to clients."""
+        return self._schemas[name].schema
+
+    async def invoke(
+        self,
+        name: str,
+        payload: Dict[str, Any],
+        ctx: "AppContext",
+        options: Optional[CallOptions] = None,
+    ) -> Dict[str, Any]:
+        options = options or CallOptions()
+        label = self._label(name)
+        timer = CallTimer(label, ctx.metrics, phases={} if options.timings else None)
+        tool = self.tools.get(name)
+        if tool is not None and tool.coalesce:
+            work = self._coalesced(tool, payload, ctx, options)
+        else:
+            work = self._dispatch(name, payload, ctx)
+        ctx.metrics.inc("mcp_tool_in_flight", 1, tool=label)
+        start = time.perf_counter()
+        try:
+            with track_call(timer):
+                resp = await self._within_deadline(work, self._timeout(options))
+        except asyncio.CancelledError:
+            # The caller went away (client disconnect, MCP cancellation).
+            ctx.metrics.inc("mcp_tool_calls_total", tool=label, status="cancelled")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            ctx.metrics.inc("mcp_tool_in_flight", -1, tool=label)
+
+        self._record(ctx, label, elapsed, resp)
+        if options.fields and resp.get("ok"):
+            resp = dict(resp)
+            resp["data"] = project(resp["data"], options.fields)
+        return self._with_timings(resp, timer, elapsed)
+
+    async def stream(
+        self,
+        name: str,
+        payload: Dict[str, Any],
+        ctx: "AppContext",
+        options: Optional[CallOptions] = None,
+        queue_size: int = 8,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{"event": "chunk", "data": ...}`` events, then one ``"done"`` event.
+
+        The ``done`` event carries the usual ``ok``/``data``/``error`` envelope.
+        Tools without a ``stream_handler`` produce no chunks: their whole
+        result arrives in ``done``. For streaming tools ``done.data`` is
+        ``{"chunks": n}``. The handler runs in its own task and at most
+        ``queue_size`` chunks wait for a slow reader, so memory per stream
+        stays bounded; closing the iterator early cancels the handler.
+        Chunks have no common shape to project, so ``options.fields`` on a
+        streaming tool is rejected with ``invalid_input``.
+        """
+        tool = self.tools.get(name)
+        if tool is None or not tool.streams:
+            resp = await self.invoke(name, payload, ctx, options)
+            yield {"event": "done", **resp}
+            return
+
+        options = options or CallOptions()
+        if options.fields:
+            resp = fail_error(ERROR_INVALID_INPUT, f"{name} streams its result; options.fields needs /call")
+            self._record(ctx, self._label(name), 0.0, resp)
+            yield {"event": "done", **resp}
+            return
+        label = self._label(name)
+        timer = CallTimer(label, ctx.metrics, phases={} if options.timings else None)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        finished = object()
+        outcome: Dict[str, Any] = {}
+
+        async def produce() -> None:
+            ctx.metrics.inc("mcp_tool_in_flight", 1, tool=label)
+            start = time.perf_counter()
+            try:
+                with track_call(timer):
+                    resp = await self._within_deadline(
+                        self._stream_into(tool, payload, ctx, queue), self._timeout(options)
+                    )
+                elapsed = time.perf_counter() - start
+                self._record(ctx, label, elapsed, resp)
+                outcome["resp"] = self._with_timings(resp, timer, elapsed)
+            finally:
+                ctx.metrics.inc("mcp_tool_in_flight", -1, tool=label)
+            await queue.put(finished)
+
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                yield {"event": "chunk", "data": item}
+            yield {"event": "done", **outcome["resp"]}
+        finally:
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _stream_into(
+        self, tool: MCPTool, payload: Dict[str, Any], ctx: "AppContext", queue: asyncio.Queue
+    ) -> Dict[str, Any]:
+        try:
+            self._schemas[tool.name].validate(payload)
+        except SchemaError as exc:
+            return fail_error(ERROR_INVALID_INPUT, str(exc))
+
+        return await self.admitted(tool.name, ctx, lambda: self._pump(tool, payload, ctx, queue))
+
+    async def _pump(
+        self, tool: MCPTool, payload: Dict[str, Any], ctx: "AppContext", queue: asyncio.Queue
+    ) -> Dict[str, Any]:
+        count = 0
+        try:
+            if tool._stream_resolved is None and isinstance(tool.stream_handler, str):
+                handler = await ctx.run_sync(tool.resolve_stream)
+            else:
+                handler = tool.resolve_stream()
+            async for chunk in handler(ctx, payload):
+                if _is_envelope(chunk) and not chunk["ok"]:
+                    return chunk
+                await queue.put(chunk)
+                count += 1
+        except Exception as exc:
+            return fail_error(ERROR_TOOL_EXECUTION, str(exc))
+        return ok({"chunks": count})
+
+    def _timeout(self, options: CallOptions) -> Optional[float]:
+        if options.timeout_ms is not None and options.timeout_ms > 0:
+            return options.timeout_ms / 1000
+        return self.default_timeout
+
+    @staticmethod
+    async def _within_deadline(work: Awaitable[Dict[str, Any]], timeout: Optional[float]) -> Dict[str, Any]:
+        """Await ``work`` under a deadline visible to ``ctx.http`` (``mcp_server.core.deadline``)."""
+        with deadline_scope(timeout) as deadline:
+            if deadline is None:
+                return await work
+            try:
+                return await asyncio.wait_for(work, max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                budget = f"{timeout:g}s" if timeout is not None else "the caller's deadline"
+                return fail_error(ERROR_DEADLINE_EXCEEDED, f"no result within {budget}")
+
+    async def _coalesced(
+        self, tool: MCPTool, payload: Dict[str, Any], ctx: "AppContext", options: CallOptions
+    ) -> Dict[str, Any]:
+        """Join (or start) the one in-flight execution for this tool and payload.
+
+        The execution runs as its own task in a fresh context, so it carries
+        neither the first caller's deadline nor its timer: each caller bounds
+        only its own wait and replays the execution's phases into its own
+        timings. A caller that goes away does not cancel it for the others;
+        the last one to leave does. Responses a caller did not start itself
+        carry ``meta.coalesced``.
+        """
+        key = (tool.name, _payload_key(payload))
+        # A reused result has no timings of its own and may predate a cache bypass.
+        reuse = not options.timings and not (tool.cache_flag and payload.get(tool.cache_flag) is False)
+        self._prune_shared(time.monotonic())
+        shared = self._shared.get(key) if reuse else None
+        if shared is not None:
+            ctx.metrics.inc("mcp_tool_coalesced_total", tool=tool.name)
+            return _coalesced_response(shared[1])
+
+        flight = self._flights.get(key)
+        joined = flight is not None
+        if flight is None:
+            task = asyncio.get_running_loop().create_task(
+                self._fly(tool.name, payload, ctx), context=contextvars.Context()
+            )
+            flight = self._flights[key] = _Flight(task)
+            task.add_done_callback(lambda done: self._landed(tool, key, done))
+        else:
+            ctx.metrics.inc("mcp_tool_coalesced_total", tool=tool.name)
+        flight.waiters += 1
+        try:
+            resp, phases = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+        for name, seconds in phases.items():
+            record_phase(name, seconds)
+        return _coalesced_response(resp) if joined else dict(resp)
+
+    async def _fly(self, name: str, payload: Dict[str, Any], ctx: "AppContext") -> FlightResult:
+        timer = CallTimer(name, Metrics(), phases={})
+        with track_call(timer):
+            resp = await self._dispatch(name, payload, ctx)
+        return resp, timer.phases or {}
+
+    def _landed(self, tool: MCPTool, key: FlightKey, task: "asyncio.Task[FlightResult]") -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        if tool.coalesce_window <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        resp, _ = task.result()
+        if not resp.get("ok"):
+            return
+        now = time.monotonic()
+        self._prune_shared(now)
+        while len(self._shared) >= self.MAX_SHARED_RESULTS:
+            del self._shared[next(iter(self._shared))]
+        expires = now + tool.coalesce_window
+        self._shared[key] = (expires, resp)
+        heapq.heappush(self._expiries, (expires, key))
+
+    def _prune_shared(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            _, key = heapq.heappop(self._expiries)
+            shared = self._shared.get(key)
+            # The key may have been stored again since, with a later expiry.
+            if shared is not None and shared[0] <= now:
+                del self._shared[key]
+
+    def _label(self, name: str) -> str:
+        # Unknown names share one label so typos cannot blow up metric cardinality.
+        return name if name in self.tools else "unknown"
+
+    @staticmethod
+    def _record(ctx: "AppContext", label: str, elapsed: float, resp: Dict[str, Any]) -> None:
+        ctx.metrics.observe("mcp_tool_duration_seconds", elapsed, tool=label)
+        if resp.get("ok"):
+            ctx.metrics.inc("mcp_tool_calls_total", tool=label, status="ok")
+        else:
+            ctx.metrics.inc("mcp_tool_calls_total", tool=label, status="error")
+            code = (resp.get("error") or {}).get("code") or ERROR_TOOL_EXECUTION["code"]
+            ctx.metrics.inc("mcp_tool_errors_total", tool=label, code=code)
 
-    def invoke(self, name: str, payload: Dict[str, Any], ctx: "AppContext") -> Dict[str, Any]:
+    @staticmethod
+    def _with_timings(resp: Dict[str, Any], timer: CallTimer, elapsed: float) -> Dict[str, Any]:
+        if timer.phases is None:
+            return resp
+        resp = dict(resp)
+        resp["meta"] = {
+            **resp.get("meta", {}),
+            "timings": {
+                "total_ms": round(elapsed * 1000, 3),
+                "phases_ms": {key: round(value * 1000, 3) for key, value in timer.phases.items()},
+            },
+        }
+        return resp
+
+    async def _dispatch(self, name: str, payload: Dict[str, Any], ctx: "AppContext") -> Dict[str, Any]:
         tool = self.tools.get(name)
         if not tool:
             err = dict(ERROR_TOOL_NOT_FOUND)
             err["message"] = f"Tool not found: {name}"
             return fail_error(err)
 
+        # Reject malformed input before any handler module is imported or run.
+        try:
+            self._schemas[name].validate(payload)
+        except SchemaError as exc:
+            return fail_error(ERROR_INVALID_INPUT, str(exc))
+
+        return await self.admitted(name, ctx, lambda: self._execute(tool, payload, ctx))
+
+    async def admitted(
+        self, name: str, ctx: "AppContext", run: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run ``run()`` in one of the tool's concurrency slots, or fail fast with ``overloaded``.
+
+        Tools that fan out into another tool's work (``wechat.article.fetch_many``)
+        call this per item so the fan-out shares that tool's limit.
+        """
+        limiter = self.limiter(name, ctx)
+        if limiter is None:
+            return await run()
         try:
-            data = tool.handler(ctx, payload)
-            if isinstance(data, dict) and set(data.keys()) == {"ok", "data", "error"}:
+            with phase("queue"):
+                started = await limiter.acquire()
+        except Overloaded as exc:
+            ctx.metrics.inc("mcp_tool_rejected_total", tool=name)
+            return overloaded(exc.retry_after)
+        healthy: Optional[bool] = None
+        try:
+            resp = await run()
+            if resp.get("ok"):
+                healthy = True
+            elif (resp.get("error") or {}).get("code") in _UNHEALTHY_ERRORS:
+                healthy = False
+            return resp
+        except asyncio.CancelledError:
+            # Cut off by the call's own deadline: the tool was too slow, not abandoned.
+            left = remaining()
+            if left is not None and left <= 0:
+                healthy = False
+            raise
+        finally:
+            limiter.release(started, healthy)
+
+    async def _execute(self, tool: MCPTool, payload: Dict[str, Any], ctx: "AppContext") -> Dict[str, Any]:
+        try:
+            # The first call imports the handler module; do that off the loop.
+            handler = tool.resolve() if tool.loaded else await ctx.run_sync(tool.resolve)
+            if inspect.iscoroutinefunction(handler):
+                data = await handler(ctx, payload)
+            else:
+                data = await ctx.run_sync(handler, ctx, payload)
+            if _is_envelope(data):
                 return data
             return ok(data)
         except Exception as exc:
             return fail_error(ERROR_TOOL_EXECUTION, str(exc))
+
+    async def invoke_many(
+        self,
+        calls: Sequence[Tuple[str, Dict[str, Any], Optional[CallOptions]]],
+        ctx: "AppContext",
+        max_concurrency: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """Invoke ``(name, payload, options)`` calls concurrently; results keep the input order."""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(name: str, payload: Dict[str, Any], options: Optional[CallOptions]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.invoke(name, payload, ctx, options)
+
+        return list(await asyncio.gather(*(run(*call) for call in calls)))
+
+
+def _payload_key(payload: Dict[str, Any]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _coalesced_response(resp: Dict[str, Any]) -> Dict[str, Any]:
+    return {**resp, "meta": {**resp.get("meta", {}), "coalesced": True}}
+
+
+def _is_envelope(value: Any) -> bool:
+    return isinstance(value, dict) and set(value.keys()) == {"ok", "data", "error"}
@@ -1,7 +1,7 @@
 ﻿# wechat_mcp/core/response.py
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Optional
 
-from mcp_server.core.errors import ERROR_TOOL_EXECUTION
+from mcp_server.core.errors import ERROR_OVERLOADED, ERROR_TOOL_EXECUTION
 
 
 def ok(data: Any = None) -> Dict[str, Any]:
@@ -31,3 +31,43 @@ def fail_error(error: Dict[str, Any], hint: str = "") -> Dict[str, Any]:
         error.get("message", ERROR_TOOL_EXECUTION["message"]),
         merged_hint,
     )
+
+
+def overloaded(retry_after: float) -> Dict[str, Any]:
+    """``overloaded`` failure telling the caller when to come back (``error.retry_after``)."""
+    resp = fail_error(ERROR_OVERLOADED, f"Retry in {retry_after:.0f}s")
+    resp["error"]["retry_after"] = retry_after
+    return resp
+
+
+def project(data: Any, fields: Iterable[str]) -> Any:
+    """Keep only the dotted ``fields`` paths of ``data``.
+
+    Lists are projected element-wise, so ``"results.data.title"`` selects the
+    title of every batch item. Paths that do not exist are skipped, and a
+    shorter path wins over a longer one it covers (``"data"`` beats
+    ``"data.title"``).
+    """
+    tree: Dict[str, Any] = {}
+    for dotted in fields:
+        node: Optional[Dict[str, Any]] = tree
+        parts = [part for part in dotted.split(".") if part]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None
+            else:
+                child = node.setdefault(part, {})
+                if child is None:
+                    break
+                node = child
+    return _project(data, tree)
+
+
+def _project(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _project(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
@@ -0,0 +1,251 @@
+# wechat_mcp/core/schema.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Raises SchemaError; ``path`` is the dotted location of the failing value.
+Validator = Callable[[Any, str], None]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, float) and v.is_integer()),
+}
+
+
+class SchemaError(ValueError):
+    def __init__(self, path: str, message: str) -> None:
+        super().__init__(f"{path}: {message}")
+        self.path = path
+        self.message = message
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    schema: Dict[str, Any]
+    validate_at: Validator
+
+    def validate(self, value: Any, root: str = "input") -> None:
+        self.validate_at(value, root)
+
+
+def compile_schema(schema: Dict[str, Any]) -> CompiledSchema:
+    """Compile a JSON Schema subset into a chain of closures.
+
+    Supported keywords: ``type``, ``enum``, ``const``, ``properties``,
+    ``required``, ``additionalProperties``, ``items``, ``minItems``/``maxItems``,
+    ``minLength``/``maxLength``, ``pattern``, ``minimum``/``maximum``,
+    ``exclusiveMinimum``/``exclusiveMaximum`` and ``anyOf``. Other keywords
+    (``format``, ``description``, ``default``, ...) are accepted and ignored,
+    as JSON Schema allows. The schema itself is checked once here, so a
+    malformed tool definition fails at registration rather than per call.
+    """
+    return CompiledSchema(schema=schema, validate_at=_compile(schema, "#"))
+
+
+def _compile(schema: Any, where: str) -> Validator:
+    if schema is True or schema == {}:
+        return _accept
+    if schema is False:
+        return _reject
+    if not isinstance(schema, dict):
+        raise TypeError(f"{where}: schema must be an object or boolean")
+
+    checks: List[Validator] = []
+    types = schema.get("type")
+    if types is not None:
+        checks.append(_type_check(types, where))
+    if "enum" in schema:
+        checks.append(_enum_check(list(schema["enum"])))
+    if "const" in schema:
+        checks.append(_enum_check([schema["const"]]))
+    checks.extend(_string_checks(schema, where))
+    checks.extend(_number_checks(schema))
+    if any(key in schema for key in ("properties", "required", "additionalProperties")):
+        checks.append(_object_check(schema, where))
+    if any(key in schema for key in ("items", "minItems", "maxItems")):
+        checks.append(_array_check(schema, where))
+    if "anyOf" in schema:
+        checks.append(_any_of_check([_compile(sub, f"{where}/anyOf/{i}") for i, sub in enumerate(schema["anyOf"])]))
+
+    if not checks:
+        return _accept
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value: Any, path: str) -> None:
+        for check in checks:
+            check(value, path)
+
+    return validate
+
+
+def _accept(value: Any, path: str) -> None:
+    return None
+
+
+def _reject(value: Any, path: str) -> None:
+    raise SchemaError(path, "no value is allowed here")
+
+
+def _type_check(types: Any, where: str) -> Validator:
+    names = [types] if isinstance(types, str) else list(types)
+    unknown = [name for name in names if name not in _TYPE_CHECKS]
+    if unknown:
+        raise TypeError(f"{where}: unknown type {unknown[0]!r}")
+    tests = tuple(_TYPE_CHECKS[name] for name in names)
+    expected = " or ".join(names)
+
+    def check(value: Any, path: str) -> None:
+        for test in tests:
+            if test(value):
+                return
+        raise SchemaError(path, f"expected {expected}, got {_describe(value)}")
+
+    return check
+
+
+def _enum_check(options: List[Any]) -> Validator:
+    def check(value: Any, path: str) -> None:
+        # ``1 == True`` in Python, so compare types as well.
+        for option in options:
+            if value == option and type(value) is type(option):
+                return
+        raise SchemaError(path, f"must be one of {options!r}")
+
+    return check
+
+
+def _string_checks(schema: Dict[str, Any], where: str) -> List[Validator]:
+    checks: List[Validator] = []
+    min_len: Optional[int] = schema.get("minLength")
+    max_len: Optional[int] = schema.get("maxLength")
+    if min_len is not None or max_len is not None:
+
+        def check_length(value: Any, path: str) -> None:
+            if isinstance(value, str):
+                if min_len is not None and len(value) < min_len:
+                    raise SchemaError(path, f"must be at least {min_len} characters")
+                if max_len is not None and len(value) > max_len:
+                    raise SchemaError(path, f"must be at most {max_len} characters")
+
+        checks.append(check_length)
+    if "pattern" in schema:
+        try:
+            pattern = re.compile(schema["pattern"])
+        except re.error as exc:
+            raise TypeError(f"{where}: invalid pattern: {exc}") from exc
+
+        def check_pattern(value: Any, path: str) -> None:
+            if isinstance(value, str) and not pattern.search(value):
+                raise SchemaError(path, f"does not match {pattern.pattern!r}")
+
+        checks.append(check_pattern)
+    return checks
+
+
+def _number_checks(schema: Dict[str, Any]) -> List[Validator]:
+    bounds: List[Tuple[Callable[[Any, Any], bool], Any, str]] = []
+    if "minimum" in schema:
+        bounds.append((lambda v, b: v >= b, schema["minimum"], ">="))
+    if "maximum" in schema:
+        bounds.append((lambda v, b: v <= b, schema["maximum"], "<="))
+    if "exclusiveMinimum" in schema:
+        bounds.append((lambda v, b: v > b, schema["exclusiveMinimum"], ">"))
+    if "exclusiveMaximum" in schema:
+        bounds.append((lambda v, b: v < b, schema["exclusiveMaximum"], "<"))
+    if not bounds:
+        return []
+
+    def check(value: Any, path: str) -> None:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        for test, bound, op in bounds:
+            if not test(value, bound):
+                raise SchemaError(path, f"must be {op} {bound}")
+
+    return [check]
+
+
+def _object_check(schema: Dict[str, Any], where: str) -> Validator:
+    properties = {
+        name: _compile(sub, f"{where}/properties/{name}") for name, sub in schema.get("properties", {}).items()
+    }
+    required = tuple(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    extra: Optional[Validator] = None
+    if additional is not True:
+        extra = _compile(additional, f"{where}/additionalProperties")
+
+    def check(value: Any, path: str) -> None:
+        if not isinstance(value, dict):
+            return
+        for name in required:
+            if name not in value:
+                raise SchemaError(path, f"missing required property {name!r}")
+        for name, item in value.items():
+            validator = properties.get(name)
+            if validator is not None:
+                validator(item, f"{path}.{name}")
+            elif extra is not None:
+                if additional is False:
+                    raise SchemaError(path, f"unexpected property {name!r}")
+                extra(item, f"{path}.{name}")
+
+    return check
+
+
+def _array_check(schema: Dict[str, Any], where: str) -> Validator:
+    items = _compile(schema["items"], f"{where}/items") if "items" in schema else None
+    min_items: Optional[int] = schema.get("minItems")
+    max_items: Optional[int] = schema.get("maxItems")
+
+    def check(value: Any, path: str) -> None:
+        if not isinstance(value, list):
+            return
+        if min_items is not None and len(value) < min_items:
+            raise SchemaError(path, f"must have at least {min_items} items")
+        if max_items is not None and len(value) > max_items:
+            raise SchemaError(path, f"must have at most {max_items} items")
+        if items is not None and items is not _accept:
+            for index, item in enumerate(value):
+                items(item, f"{path}[{index}]")
+
+    return check
+
+
+def _any_of_check(options: List[Validator]) -> Validator:
+    def check(value: Any, path: str) -> None:
+        errors = []
+        for option in options:
+            try:
+                option(value, path)
+                return
+            except SchemaError as exc:
+                errors.append(exc.message)
+        raise SchemaError(path, "does not match any allowed schema (" + "; ".join(errors) + ")")
+
+    return check
+
+
+def _describe(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, (int, float)):
+        return "number"
+    return type(value).__name__
@@ -0,0 +1,195 @@
+# wechat_mcp/core/web.py
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import zstandard
+except ModuleNotFoundError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+T = TypeVar("T")
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable[T]) -> Optional[T]:
+    """Await ``work``, cancelling it if the client disconnects first.
+
+    Returns ``None`` when cancelled. Only call this once the request body
+    has been read; the next ASGI message is then the disconnect.
+    """
+    task = asyncio.ensure_future(work)
+
+    async def watch() -> None:
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                task.cancel()
+                return
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if watcher.done() and task.cancelled():
+            return None
+        raise
+    finally:
+        watcher.cancel()
+
+
+def dumps_bytes(content: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(content, default=str, option=option)
+    separators = None if indent else (",", ":")
+    text = json.dumps(content, ensure_ascii=False, indent=2 if indent else None, separators=separators, default=str)
+    return text.encode("utf-8")
+
+
+def dumps(content: Any, indent: bool = False) -> str:
+    return dumps_bytes(content, indent).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with ``dumps_bytes``.
+
+    Endpoints that return one directly also skip FastAPI's ``jsonable_encoder``
+    pass, which dominates serialization time for large tool results.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _zstd(body: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+class CompressionMiddleware:
+    """Negotiate zstd or gzip for complete (non-streaming) responses.
+
+    Only bodies of at least ``minimum_size`` bytes with a compressible content
+    type are encoded. A response sent in several chunks (SSE, NDJSON) passes
+    through untouched, so streaming endpoints keep their latency.
+    """
+
+    COMPRESSIBLE = ("application/json", "text/plain", "text/html")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders: Dict[str, Callable[[bytes], bytes]] = {"gzip": lambda body: _gzip(body, gzip_level)}
+        if zstandard is not None:
+            self.encoders["zstd"] = lambda body: _zstd(body, zstd_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._negotiate(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            assert start is not None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._compressible(start, body):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            compressed = self.encoders[encoding](body)
+            headers = [
+                (key, value)
+                for key, value in start.get("headers", [])
+                if key.lower() not in (b"content-length", b"content-encoding")
+            ]
+            headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _negotiate(self, scope: Scope) -> Optional[str]:
+        accept = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1").lower()
+                break
+        offered = _parse_accept_encoding(accept)
+        for encoding in ("zstd", "gzip"):
+            if encoding in self.encoders and offered.get(encoding, 0.0) > 0:
+                return encoding
+        return None
+
+    def _compressible(self, start: Message, body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        content_type = b""
+        for key, value in start.get("headers", []):
+            lowered = key.lower()
+            if lowered == b"content-encoding":
+                return False
+            if lowered == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").startswith(self.COMPRESSIBLE)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    offered: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[name.strip()] = quality
+    if "*" in offered:
+        for name in ("zstd", "gzip"):
+            offered.setdefault(name, offered["*"])
+    return offered
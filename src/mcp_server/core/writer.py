@@ -0,0 +1,138 @@
+# wechat_mcp/core/writer.py
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+Content = Union[str, bytes]
+FileWrite = Tuple[Path, Content]
+
+_STOP = object()
+
+
+def write_atomic(path: Path, content: Content) -> None:
+    """Write to a temp file in the target directory, then rename over ``path``."""
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        if isinstance(content, bytes):
+            tmp.write_bytes(content)
+        else:
+            tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class FileWriter:
+    """Write-behind file persistence on a background thread.
+
+    Callers enqueue finished content and return immediately; the writer
+    drains the bounded queue in batches, creates each batch's directories
+    once, and writes every file atomically. When the queue stays full for
+    ``put_timeout`` seconds the caller writes synchronously instead, so
+    backpressure never drops data.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1024,
+        batch_size: int = 64,
+        put_timeout: float = 5.0,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._batch_size = max(1, batch_size)
+        self._put_timeout = put_timeout
+        self._logger = logger or logging.getLogger("wechat_mcp")
+        self._known_dirs: Set[Path] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def from_config(config: Dict[str, Any], logger: Optional[logging.Logger] = None) -> "FileWriter":
+        writer_cfg = config.get("writer", {})
+        return FileWriter(
+            queue_size=int(writer_cfg.get("queue_size", 1024)),
+            batch_size=int(writer_cfg.get("batch_size", 64)),
+            put_timeout=float(writer_cfg.get("put_timeout", 5.0)),
+            logger=logger,
+        )
+
+    def submit(self, path: Path, content: Content) -> None:
+        self.submit_many([(path, content)])
+
+    def submit_many(self, files: Iterable[FileWrite]) -> None:
+        files = list(files)
+        # Enqueue under the lock close() takes, so nothing lands behind _STOP.
+        with self._start_lock:
+            if not self._closed:
+                self._ensure_started()
+                try:
+                    self._queue.put(files, timeout=self._put_timeout)
+                    return
+                except queue.Full:
+                    self._logger.warning("write-behind queue full; writing %d file(s) inline", len(files))
+        self._write_batch(files)
+
+    def close(self) -> None:
+        """Flush pending writes and stop the background thread."""
+        with self._start_lock:
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+
+    def _ensure_started(self) -> None:
+        # Caller holds _start_lock.
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mcp-file-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[FileWrite] = []
+            stop = item is _STOP
+            taken = 1
+            if not stop:
+                batch.extend(item)
+            while not stop and len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.extend(item)
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, files: List[FileWrite]) -> None:
+        for directory in {path.parent for path, _ in files} - self._known_dirs:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                self._logger.exception("failed to create %s", directory)
+                continue
+            self._known_dirs.add(directory)
+        for path, content in files:
+            try:
+                write_atomic(path, content)
+            except OSError:
+                self._logger.exception("failed to write %s", path)
@@ -2,37 +2,89 @@
 import contextlib
 import importlib
 import sys
+import time
+from importlib.metadata import entry_points
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Set
 
-from fastapi import FastAPI, HTTPException
-from mcp.server.fastmcp import FastMCP
-from pydantic import BaseModel
+import mcp.types as mcp_types
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from pydantic import BaseModel, Field
 
 from mcp_server.core.context import AppContext
-from mcp_server.core.registry import MCPTool, ToolRegistry
+from mcp_server.core.errors import ERROR_INVALID_INPUT, ERROR_OVERLOADED
+from mcp_server.core.registry import CallOptions, MCPTool, ToolRegistry
+from mcp_server.core.response import fail_error, ok
+from mcp_server.core.web import CompressionMiddleware, FastJSONResponse, cancel_on_disconnect, dumps, dumps_bytes
+
+
+PLUGIN_ENTRY_POINT_GROUP = "mcp_server.plugins"
+# Non-standard status (nginx) logged for calls abandoned by the client.
+CLIENT_CLOSED_REQUEST = 499
 
 
 def load_plugins(registry: ToolRegistry, ctx: AppContext, providers_dir: Path) -> None:
+    """Register providers declared under the ``mcp_server.plugins`` entry point group.
+
+    Workspace providers under ``providers_dir`` that are not installed yet are
+    still picked up for local development.
+    """
+    loaded: Set[str] = set()
+    for entry_point in entry_points(group=PLUGIN_ENTRY_POINT_GROUP):
+        if entry_point.name not in loaded:
+            _register_plugin(registry, ctx, entry_point.name, entry_point.load)
+            loaded.add(entry_point.name)
+
     if not providers_dir.exists():
         return
 
-    for entry in providers_dir.iterdir():
-        if not entry.is_dir():
+    for entry in sorted(providers_dir.iterdir()):
+        if not entry.is_dir() or entry.name in loaded:
             continue
         module_name = f"{entry.name}.plugin"
-        try:
-            module = importlib.import_module(module_name)
-        except ModuleNotFoundError:
-            # Allow local dev without installing workspace package
-            src_path = entry / "src"
-            if src_path.exists():
+
+        def load_local(module_name: str = module_name, entry: Path = entry) -> Any:
+            try:
+                module = importlib.import_module(module_name)
+            except ModuleNotFoundError:
+                # Allow local dev without installing workspace package
+                src_path = entry / "src"
+                if not src_path.exists():
+                    return None
                 sys.path.insert(0, str(src_path))
                 module = importlib.import_module(module_name)
-            else:
-                continue
-        if hasattr(module, "register"):
-            module.register(registry, ctx)
+            return getattr(module, "register", None)
+
+        _register_plugin(registry, ctx, entry.name, load_local)
+
+
+def _register_plugin(registry: ToolRegistry, ctx: AppContext, name: str, load: Callable[[], Any]) -> None:
+    start = time.perf_counter()
+    register = load()
+    imported = time.perf_counter()
+    if register is None:
+        return
+    before = len(registry.tools)
+    register(registry, ctx)
+    ctx.logger.info(
+        "plugin %s: %d tools, import %.1f ms, register %.1f ms",
+        name,
+        len(registry.tools) - before,
+        (imported - start) * 1000,
+        (time.perf_counter() - imported) * 1000,
+    )
+
+
+def error_status(resp: Dict[str, Any]) -> HTTPException:
+    """HTTP error for a failed envelope: 503 with ``Retry-After`` when overloaded, else 400."""
+    error = resp.get("error") or {}
+    if error.get("code") == ERROR_OVERLOADED["code"]:
+        retry_after = str(int(error.get("retry_after") or 1))
+        return HTTPException(status_code=503, detail=resp, headers={"Retry-After": retry_after})
+    return HTTPException(status_code=400, detail=resp)
 
 
 def build_context(config_path: Path) -> AppContext:
@@ -42,36 +94,110 @@ def build_context(config_path: Path) -> AppContext:
 class ToolCall(BaseModel):
     tool: str
     input: Dict[str, Any] = {}
+    options: CallOptions = Field(default_factory=CallOptions)
+
 
+def build_mcp_server(registry: ToolRegistry, ctx: AppContext) -> Server:
+    # Tools are bridged through the low-level server so MCP calls take the same
+    # async ``registry.invoke`` path as ``/call`` and publish each tool's own schema.
+    server = Server("ClaudeCode-MCP")
 
-def register_mcp_tools(mcp: FastMCP, registry: ToolRegistry, ctx: AppContext) -> None:
-    def make_tool(tool: MCPTool):
-        @mcp.tool(name=tool.name, description=tool.description)
-        def _tool(**kwargs):
-            return tool.handler(ctx, kwargs)
+    def to_mcp_tool(tool: MCPTool) -> mcp_types.Tool:
+        return mcp_types.Tool(name=tool.name, description=tool.description, inputSchema=registry.schema(tool.name))
 
-        return _tool
+    @server.list_tools()
+    async def _list_tools() -> List[mcp_types.Tool]:
+        return [to_mcp_tool(tool) for tool in registry.tools.values()]
 
-    for tool in registry.tools.values():
-        make_tool(tool)
+    # ``registry.invoke`` validates against the same schema and answers with the
+    # usual ``invalid_input`` envelope; mcp's own check would preempt it with plain text.
+    @server.call_tool(validate_input=False)
+    async def _call_tool(name: str, arguments: Dict[str, Any]) -> List[mcp_types.TextContent]:
+        # Clients opt into per-call timings, projection and a time budget with
+        # ``_meta: {"timings": true, "fields": [...], "timeout_ms": 30000}`` on the request.
+        # ``notifications/cancelled`` from the client cancels the call.
+        meta = server.request_context.meta
+        fields = getattr(meta, "fields", None)
+        timeout_ms = getattr(meta, "timeout_ms", None)
+        options = CallOptions(
+            timings=bool(getattr(meta, "timings", False)),
+            fields=[str(path) for path in fields] if isinstance(fields, list) else None,
+            timeout_ms=int(timeout_ms) if isinstance(timeout_ms, (int, float)) else None,
+        )
+        tool = registry.tools.get(name)
+        progress_token = getattr(meta, "progressToken", None)
+        # A projection needs the whole result, so ``fields`` turns progress streaming off.
+        if progress_token is not None and tool is not None and tool.streams and not options.fields:
+            resp = await _call_streaming(name, arguments or {}, options, progress_token)
+        else:
+            resp = await registry.invoke(name, arguments or {}, ctx, options)
+        return [mcp_types.TextContent(type="text", text=dumps(resp))]
+
+    async def _call_streaming(
+        name: str, arguments: Dict[str, Any], options: CallOptions, progress_token: str | int
+    ) -> Dict[str, Any]:
+        # Each chunk goes out as a progress notification as soon as it is ready
+        # (delivered when the transport streams SSE, see [server].mcp_json_response).
+        # The final result still carries every chunk for clients that ignore progress.
+        request = server.request_context
+        chunks: List[Any] = []
+        resp: Dict[str, Any] = {}
+        async for event in registry.stream(name, arguments, ctx, options):
+            if event["event"] == "chunk":
+                chunks.append(event["data"])
+                await request.session.send_progress_notification(
+                    progress_token,
+                    progress=len(chunks),
+                    message=dumps(event["data"]),
+                    related_request_id=str(request.request_id),
+                )
+            else:
+                resp = {key: value for key, value in event.items() if key != "event"}
+        if resp.get("ok"):
+            resp["data"] = {"chunks": chunks}
+        return resp
+
+    return server
 
 
 def create_app(config_path: Path | None = None) -> FastAPI:
+    started = time.perf_counter()
     cfg = Path("config.example.toml") if config_path is None else config_path
     ctx = build_context(cfg)
-    registry = ToolRegistry()
+    server_cfg = ctx.config.get("server", {})
+    call_timeout = float(server_cfg.get("call_timeout", 0))
+    registry = ToolRegistry(
+        default_timeout=call_timeout if call_timeout > 0 else None,
+        limits=server_cfg.get("limits", {}),
+    )
     repo_root = Path(__file__).resolve().parents[2]
     load_plugins(registry, ctx, repo_root / "src" / "providers")
 
-    mcp = FastMCP("ClaudeCode-MCP", json_response=True, streamable_http_path="/")
-    register_mcp_tools(mcp, registry, ctx)
+    mcp_server = build_mcp_server(registry, ctx)
+    # Plain JSON replies by default; SSE is needed for progress notifications to reach clients.
+    json_response = bool(ctx.config.get("server", {}).get("mcp_json_response", True))
+    session_manager = StreamableHTTPSessionManager(app=mcp_server, json_response=json_response)
+
+    async def handle_mcp(scope, receive, send) -> None:
+        await session_manager.handle_request(scope, receive, send)
 
     @contextlib.asynccontextmanager
     async def lifespan(app: FastAPI):
-        async with mcp.session_manager.run():
-            yield
+        try:
+            async with session_manager.run():
+                yield
+        finally:
+            await ctx.aclose()
 
     app = FastAPI(title="MCP Server", version="0.1.0", lifespan=lifespan)
+    compression_cfg = ctx.config.get("server", {}).get("compression", {})
+    if compression_cfg.get("enabled", True):
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=int(compression_cfg.get("minimum_size", 1024)),
+            gzip_level=int(compression_cfg.get("gzip_level", 6)),
+            zstd_level=int(compression_cfg.get("zstd_level", 3)),
+        )
 
     @app.get("/")
     def read_root():
@@ -81,16 +207,78 @@ def create_app(config_path: Path | None = None) -> FastAPI:
     def list_tools() -> Dict[str, Any]:
         return {"tools": sorted(registry.tools.keys())}
 
-    @app.post("/call")
-    def call_tool(req: ToolCall) -> Dict[str, Any]:
-        resp = registry.invoke(req.tool, req.input, ctx)
+    # Tool results can be hundreds of KB; render them straight to bytes
+    # instead of going through ``jsonable_encoder`` first.
+    @app.post("/call", response_class=FastJSONResponse)
+    async def call_tool(req: ToolCall, request: Request) -> Response:
+        # Work for a client that has gone away is cancelled instead of holding a worker slot.
+        resp = await cancel_on_disconnect(request, registry.invoke(req.tool, req.input, ctx, req.options))
+        if resp is None:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
         if not resp.get("ok"):
-            raise HTTPException(status_code=400, detail=resp)
-        return resp
+            raise error_status(resp)
+        return FastJSONResponse(resp)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(ctx.metrics.render(), media_type="text/plain; version=0.0.4")
 
-    app.mount("/mcp/", mcp.streamable_http_app())
+    batch_max_items = int(server_cfg.get("batch_max_items", 100))
+    batch_max_concurrency = int(server_cfg.get("batch_max_concurrency", 8))
 
+    @app.post("/call/batch", response_class=FastJSONResponse)
+    async def call_batch(reqs: List[ToolCall], request: Request) -> Response:
+        if len(reqs) > batch_max_items:
+            detail = fail_error(ERROR_INVALID_INPUT, f"batch exceeds {batch_max_items} items")
+            raise HTTPException(status_code=400, detail=detail)
+        results = await cancel_on_disconnect(
+            request,
+            registry.invoke_many(
+                [(req.tool, req.input, req.options) for req in reqs], ctx, max_concurrency=batch_max_concurrency
+            ),
+        )
+        if results is None:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        return FastJSONResponse(ok(results))
+
+    @app.post("/call/stream")
+    async def call_stream(req: ToolCall, request: Request) -> Response:
+        """NDJSON: one ``chunk`` event per line as the tool produces it, then ``done``."""
+        events = registry.stream(req.tool, req.input, ctx, req.options)
+        # Until the first event there is no response body to notice a disconnect for us.
+        first = await cancel_on_disconnect(request, events.__anext__())
+        if first is None:
+            await events.aclose()
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        if first["event"] == "done" and not first.get("ok"):
+            await events.aclose()
+            raise error_status({k: v for k, v in first.items() if k != "event"})
+
+        async def body():
+            try:
+                yield dumps_bytes(first) + b"\n"
+                async for event in events:
+                    yield dumps_bytes(event) + b"\n"
+            finally:
+                await events.aclose()
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    app.mount("/mcp/", handle_mcp)
+
+    ctx.logger.info("app ready: %d tools in %.1f ms", len(registry.tools), (time.perf_counter() - started) * 1000)
     return app
 
 
-app = create_app()
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str) -> Any:
+    # ``uvicorn mcp_server.main:app`` builds the default app on first access,
+    # so importing this module alone does no plugin or config work.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
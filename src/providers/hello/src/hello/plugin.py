@@ -1,6 +1,5 @@
 ﻿# wechat_mcp/providers/hello/plugin.py
-from src.mcp_server.core.registry import MCPTool
-from hello.tools.say import say
+from mcp_server.core.registry import MCPTool
 
 
 def register(registry, ctx):
@@ -9,6 +8,6 @@ def register(registry, ctx):
             name="hello.say",
             description="Return hello world",
             input_schema={"type": "object", "properties": {}, "additionalProperties": True},
-            handler=say,
+            handler="hello.tools.say:say",
         )
     )
@@ -0,0 +1,231 @@
+# wechat_mcp/providers/wechat/authors.py
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from mcp_server.core.db import Database
+
+AUTHOR_INDEX_EXTENSION = "wechat.author_index"
+
+logger = logging.getLogger("wechat_mcp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wechat_authors (
+    biz TEXT PRIMARY KEY,
+    name TEXT NOT NULL COLLATE NOCASE,
+    alias TEXT,
+    avatar TEXT,
+    signature TEXT,
+    source TEXT NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wechat_authors_name ON wechat_authors (name);
+CREATE INDEX IF NOT EXISTS wechat_authors_alias ON wechat_authors (alias COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS wechat_author_searches (
+    query TEXT PRIMARY KEY,
+    found INTEGER NOT NULL,
+    searched_at REAL NOT NULL
+);
+"""
+
+# External-content FTS5 table kept in step with ``wechat_authors`` by triggers.
+# The trigram tokenizer (SQLite 3.34+) matches any substring of three or more
+# characters, which also covers CJK names that have no word boundaries.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS wechat_authors_fts USING fts5(
+    name, alias, content='wechat_authors', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS wechat_authors_fts_insert AFTER INSERT ON wechat_authors BEGIN
+    INSERT INTO wechat_authors_fts (rowid, name, alias) VALUES (new.rowid, new.name, new.alias);
+END;
+CREATE TRIGGER IF NOT EXISTS wechat_authors_fts_delete AFTER DELETE ON wechat_authors BEGIN
+    INSERT INTO wechat_authors_fts (wechat_authors_fts, rowid, name, alias)
+        VALUES ('delete', old.rowid, old.name, old.alias);
+END;
+CREATE TRIGGER IF NOT EXISTS wechat_authors_fts_update AFTER UPDATE OF name, alias ON wechat_authors BEGIN
+    INSERT INTO wechat_authors_fts (wechat_authors_fts, rowid, name, alias)
+        VALUES ('delete', old.rowid, old.name, old.alias);
+    INSERT INTO wechat_authors_fts (rowid, name, alias) VALUES (new.rowid, new.name, new.alias);
+END;
+"""
+
+_FIELDS = "a.biz, a.name, a.alias, a.avatar, a.signature, a.source"
+
+# NOCASE folds ASCII letters only.
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _trigrams(text: str) -> Set[str]:
+    text = text.casefold()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix_range(text: str) -> Tuple[str, str]:
+    """``[low, high)`` under NOCASE covering every string that starts with ``text``."""
+    low = text.translate(_ASCII_LOWER)
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+class AuthorIndex:
+    """Known WeChat accounts (``biz`` -> name) for local author search.
+
+    Filled from every article parsed by ``wechat.article.fetch`` and from
+    remote searches. Queries rank prefix matches first, then substring
+    matches, then fuzzy matches by shared trigrams. Without FTS5 trigram
+    support the fuzzy tier is skipped and substrings are found with ``LIKE``.
+    """
+
+    def __init__(self, db: Database, min_similarity: float = 0.3) -> None:
+        self._db = db
+        self.min_similarity = min_similarity
+        self._db.executescript(_SCHEMA)
+        try:
+            self._db.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError as exc:
+            logger.info("author index: FTS5 trigram unavailable (%s); using LIKE", exc)
+            self.fts = False
+        else:
+            self.fts = True
+
+    @staticmethod
+    def from_config(db: Database, config: Dict[str, Any]) -> "AuthorIndex":
+        cfg = config.get("wechat", {}).get("authors", {})
+        return AuthorIndex(db, min_similarity=float(cfg.get("min_similarity", 0.3)))
+
+    def observe(self, biz: str, name: str) -> None:
+        """Record an account seen in a fetched article."""
+        self.record([{"biz": biz, "name": name}], source="article")
+
+    def record(self, authors: List[Dict[str, Any]], source: str) -> None:
+        """Upsert ``{"biz", "name", "alias"?, "avatar"?, "signature"?}`` rows; known fields are kept."""
+        now = time.time()
+        rows = [
+            (a["biz"], a["name"], a.get("alias"), a.get("avatar"), a.get("signature"), source, now)
+            for a in authors
+            if a.get("biz") and a.get("name")
+        ]
+        if not rows:
+            return
+        # ON CONFLICT keeps the rowid, which the FTS table is keyed on.
+        with self._db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO wechat_authors (biz, name, alias, avatar, signature, source, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (biz) DO UPDATE SET name = excluded.name, "
+                "alias = COALESCE(excluded.alias, alias), avatar = COALESCE(excluded.avatar, avatar), "
+                "signature = COALESCE(excluded.signature, signature), source = excluded.source, "
+                "seen_at = excluded.seen_at",
+                rows,
+            )
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        query = query.strip()
+        if not query:
+            return []
+        found: Dict[str, Dict[str, Any]] = {}
+
+        def collect(match: str, sql: str, params: List[Any]) -> None:
+            for biz, name, alias, avatar, signature, source in self._db.execute(sql, params):
+                if biz not in found and len(found) < limit:
+                    found[biz] = {
+                        "biz": biz,
+                        "name": name,
+                        "alias": alias,
+                        "avatar": avatar,
+                        "signature": signature,
+                        "source": source,
+                        "match": match,
+                    }
+
+        # Index range scans on name and alias; LIKE drops the few extra rows the bounds admit.
+        low, high = _prefix_range(query)
+        prefix = _like_escape(query) + "%"
+        collect(
+            "prefix",
+            f"SELECT {_FIELDS} FROM wechat_authors a "
+            "WHERE (a.name >= ? AND a.name < ? AND a.name LIKE ? ESCAPE '\\') "
+            "OR (a.alias >= ? COLLATE NOCASE AND a.alias < ? COLLATE NOCASE AND a.alias LIKE ? ESCAPE '\\') "
+            "ORDER BY length(a.name), a.name LIMIT ?",
+            [low, high, prefix, low, high, prefix, limit],
+        )
+        if len(found) < limit:
+            if self.fts and len(query) >= 3:
+                collect(
+                    "substring",
+                    f"SELECT {_FIELDS} FROM wechat_authors_fts f JOIN wechat_authors a ON a.rowid = f.rowid "
+                    "WHERE wechat_authors_fts MATCH ? ORDER BY rank LIMIT ?",
+                    [_phrase(query), limit * 2],
+                )
+            else:
+                pattern = "%" + _like_escape(query) + "%"
+                collect(
+                    "substring",
+                    f"SELECT {_FIELDS} FROM wechat_authors a WHERE a.name LIKE ? ESCAPE '\\' "
+                    "OR a.alias LIKE ? ESCAPE '\\' ORDER BY length(a.name), a.name LIMIT ?",
+                    [pattern, pattern, limit * 2],
+                )
+        if fuzzy and self.fts and len(found) < limit and len(query) >= 3:
+            self._fuzzy(query, limit, found)
+        return list(found.values())
+
+    def _fuzzy(self, query: str, limit: int, found: Dict[str, Dict[str, Any]]) -> None:
+        grams = _trigrams(query)
+        if not grams:
+            return
+        # Any shared trigram is a candidate; keep those sharing enough of the query's.
+        rows = self._db.execute(
+            f"SELECT {_FIELDS} FROM wechat_authors_fts f JOIN wechat_authors a ON a.rowid = f.rowid "
+            "WHERE wechat_authors_fts MATCH ? ORDER BY rank LIMIT ?",
+            [" OR ".join(_phrase(gram) for gram in sorted(grams)), limit * 10],
+        ).fetchall()
+        scored = []
+        for row in rows:
+            if row[0] in found:
+                continue
+            names = _trigrams(row[1]) | _trigrams(row[2] or "")
+            score = len(grams & names) / len(grams)
+            if score >= self.min_similarity:
+                scored.append((score, row))
+        scored.sort(key=lambda item: -item[0])
+        for score, (biz, name, alias, avatar, signature, source) in scored[: limit - len(found)]:
+            found[biz] = {
+                "biz": biz,
+                "name": name,
+                "alias": alias,
+                "avatar": avatar,
+                "signature": signature,
+                "source": source,
+                "match": "fuzzy",
+                "score": round(score, 3),
+            }
+
+    def searched_recently(self, query: str, ttl: float) -> bool:
+        row = self._db.execute(
+            "SELECT searched_at FROM wechat_author_searches WHERE query = ?", (query.strip().casefold(),)
+        ).fetchone()
+        return row is not None and time.time() - row[0] < ttl
+
+    def mark_searched(self, query: str, found: int) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO wechat_author_searches (query, found, searched_at) VALUES (?, ?, ?)",
+            (query.strip().casefold(), found, time.time()),
+        )
+
+    def count(self) -> int:
+        (total,) = self._db.execute("SELECT COUNT(*) FROM wechat_authors").fetchone()
+        return int(total)
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def get_author_index(ctx) -> Optional[AuthorIndex]:
+    return ctx.extensions.get(AUTHOR_INDEX_EXTENSION)
@@ -0,0 +1,175 @@
+# wechat_mcp/providers/wechat/cache.py
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from mcp_server.core.db import Database
+
+CACHE_EXTENSION = "wechat.article_cache"
+
+# Query parameters that identify a mp.weixin.qq.com/s article. Everything else
+# (chksm, scene, sessionid, ...) varies per share and would split the cache.
+_ARTICLE_ID_PARAMS = {"__biz", "mid", "idx", "sn"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wechat_article_cache (
+    url TEXT PRIMARY KEY,
+    article TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wechat_article_cache_accessed
+    ON wechat_article_cache (accessed_at);
+"""
+
+
+def normalize_article_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host if parts.port is None else f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if host == "mp.weixin.qq.com" and path.rstrip("/") == "/s":
+        query = [(k, v) for k, v in query if k in _ARTICLE_ID_PARAMS]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    article: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+    def validators(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ArticleCache:
+    """Parsed-article cache stored in ``AppContext.db``.
+
+    Entries stay readable after their TTL so the fetcher can revalidate them
+    with ETag/Last-Modified; total payload size is capped by evicting the
+    least recently accessed rows. The total is tracked in memory (seeded
+    from the table at startup), so a write only scans ``accessed_at`` when
+    it pushes the cache over the cap. A hit only rewrites ``accessed_at``
+    once the stored value is ``touch_interval`` seconds old, so hot entries
+    do not take the write lock on every read.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        ttl_seconds: float = 6 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        touch_interval: float = 60.0,
+    ) -> None:
+        self._db = db
+        self._ttl = float(ttl_seconds)
+        self._max_bytes = int(max_bytes)
+        self._touch_interval = float(touch_interval)
+        self._db.executescript(_SCHEMA)
+        # Guards _total_bytes; held across each write so the counter matches what committed.
+        self._size_lock = threading.Lock()
+        (self._total_bytes,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM wechat_article_cache"
+        ).fetchone()
+
+    @staticmethod
+    def from_config(db: Database, config: Dict[str, Any]) -> Optional["ArticleCache"]:
+        cache_cfg = config.get("wechat", {}).get("cache", {})
+        if not cache_cfg.get("enabled", True):
+            return None
+        return ArticleCache(
+            db,
+            ttl_seconds=float(cache_cfg.get("ttl_seconds", 6 * 3600)),
+            max_bytes=int(cache_cfg.get("max_bytes", 256 * 1024 * 1024)),
+            touch_interval=float(cache_cfg.get("touch_interval", 60.0)),
+        )
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        now = time.time()
+        row = self._db.execute(
+            "SELECT article, etag, last_modified, expires_at, accessed_at FROM wechat_article_cache WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        article, etag, last_modified, expires_at, accessed_at = row
+        if now - accessed_at >= self._touch_interval:
+            self._db.execute("UPDATE wechat_article_cache SET accessed_at = ? WHERE url = ?", (now, url))
+        return CacheEntry(
+            article=json.loads(article),
+            etag=etag,
+            last_modified=last_modified,
+            fresh=expires_at > now,
+        )
+
+    def put(
+        self,
+        url: str,
+        article: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        blob = json.dumps(article, ensure_ascii=False)
+        size = len(blob.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        with self._size_lock:
+            with self._db.transaction() as conn:
+                row = conn.execute("SELECT size FROM wechat_article_cache WHERE url = ?", (url,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO wechat_article_cache "
+                    "(url, article, size, etag, last_modified, fetched_at, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, blob, size, etag, last_modified, now, now + self._ttl, now),
+                )
+                total = self._total_bytes + size - (row[0] if row else 0)
+                total -= self._evict(conn, total)
+            self._total_bytes = total
+
+    def refresh(self, url: str) -> None:
+        """Extend an entry's TTL after a ``304 Not Modified`` revalidation."""
+        now = time.time()
+        self._db.execute(
+            "UPDATE wechat_article_cache SET expires_at = ?, accessed_at = ? WHERE url = ?",
+            (now + self._ttl, now, url),
+        )
+
+    def _evict(self, conn, total: int) -> int:
+        """Drop least recently accessed rows until ``total`` fits; return the bytes freed."""
+        if total <= self._max_bytes:
+            return 0
+        excess = total - self._max_bytes
+        freed = 0
+        victims = []
+        for url, size in conn.execute(
+            "SELECT url, size FROM wechat_article_cache ORDER BY accessed_at ASC"
+        ):
+            victims.append((url,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM wechat_article_cache WHERE url = ?", victims)
+        return freed
+
+
+def get_article_cache(ctx) -> Optional[ArticleCache]:
+    return ctx.extensions.get(CACHE_EXTENSION)
@@ -0,0 +1,5 @@
+# wechat_mcp/providers/wechat/constants.py
+
+# ``run -> response`` running ``run()`` under ``wechat.article.fetch``'s admission limit.
+# Kept out of ``plugin`` so tool modules can read it without importing the plugin.
+FETCH_ADMISSION_EXTENSION = "wechat.fetch_admission"
@@ -0,0 +1,54 @@
+# wechat_mcp/providers/wechat/extract/__init__.py
+from __future__ import annotations
+
+import functools
+import importlib
+from typing import Any, Dict, Optional
+
+from mcp_server.core.metrics import phase
+from wechat.extract.base import VERIFICATION_MARKER, BodyScanner, Extractor, decode_html
+
+# name -> (module, class). Fast backends are optional dependencies; "auto"
+# picks the first importable one and always falls back to bs4.
+_BACKENDS = {
+    "lxml": ("wechat.extract.lxml_backend", "LxmlExtractor"),
+    "bs4": ("wechat.extract.bs4_backend", "Bs4Extractor"),
+}
+_AUTO_ORDER = ("lxml", "bs4")
+
+
+@functools.lru_cache(maxsize=None)
+def get_extractor(name: str = "auto") -> Extractor:
+    if name == "auto":
+        for candidate in _AUTO_ORDER:
+            try:
+                return get_extractor(candidate)
+            except ModuleNotFoundError:
+                continue
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown extract backend: {name}")
+    module_name, class_name = _BACKENDS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)()
+
+
+def parse_html(
+    content: bytes,
+    charset: Optional[str],
+    backend: str = "auto",
+    hints: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Decode and extract one article page; ``None`` means the verification wall.
+
+    Takes raw bytes and returns only the extracted fields, so it is cheap to
+    run in a worker process (see ``AppContext.run_cpu``). ``hints`` are
+    passed on to the extractor (see ``BodyScanner.hints``).
+    """
+    with phase("decode"):
+        html = decode_html(content, charset)
+    if VERIFICATION_MARKER in html:
+        return None
+    return get_extractor(backend).extract(html, hints)
+
+
+__all__ = ["BodyScanner", "Extractor", "get_extractor", "parse_html"]
@@ -0,0 +1,169 @@
+# wechat_mcp/providers/wechat/extract/base.py
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Protocol
+
+try:
+    from charset_normalizer import from_bytes as _detect_charset
+except ModuleNotFoundError:  # pragma: no cover
+    _detect_charset = None  # type: ignore
+
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+BLOCK_CONTAINERS = ("p", "section", "div")
+
+# ``var biz = "" || "MzA5...";``: the id is the first non-empty string literal.
+BIZ_RE = re.compile(r"var biz\s*=\s*([^;\n]*);")
+CREATE_TIME_RE = re.compile(r"var createTime\s*=\s*'(.*?)';")
+_STRING_LITERAL_RE = re.compile(r"\"([^\"]*)\"")
+
+# Shown instead of the article when WeChat wants a captcha solved.
+VERIFICATION_MARKER = "当前环境异常，完成验证后即可继续访问"
+
+# The same patterns over raw bytes, for ``BodyScanner``.
+_BIZ_BYTES_RE = re.compile(BIZ_RE.pattern.encode("ascii"))
+_CREATE_TIME_BYTES_RE = re.compile(CREATE_TIME_RE.pattern.encode("ascii"))
+_VERIFICATION_MARKER_BYTES = VERIFICATION_MARKER.encode("utf-8")
+# ``<meta charset="utf-8">`` or ``<meta http-equiv="Content-Type" content="text/html; charset=utf-8">``.
+_META_CHARSET_RE = re.compile(rb"<meta[^>]*?charset\s*=\s*[\"']?\s*([A-Za-z0-9._:-]+)", re.IGNORECASE)
+# Browsers only honour a meta charset within the first 1024 bytes; allow some slack.
+META_SNIFF_BYTES = 4096
+
+
+class Extractor(Protocol):
+    name: str
+
+    def extract(self, html: str, hints: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """``hints`` may carry ``biz``/``create_time`` already found by ``BodyScanner``."""
+        ...
+
+
+def sniff_charset(head: bytes) -> Optional[str]:
+    """The charset declared by a ``<meta>`` tag near the start of the page, if any."""
+    match = _META_CHARSET_RE.search(head[:META_SNIFF_BYTES])
+    return match.group(1).decode("ascii").lower() if match else None
+
+
+def decode_html(content: bytes, charset: Optional[str] = None) -> str:
+    """Decode a response body.
+
+    Order: the ``Content-Type`` charset, the ``<meta>`` charset, strict UTF-8,
+    and only then statistical detection over the whole body.
+    """
+    for declared in (charset, sniff_charset(content)):
+        if declared:
+            try:
+                return content.decode(declared, errors="replace")
+            except LookupError:
+                pass
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        if _detect_charset is not None:
+            best = _detect_charset(content).best()
+            if best is not None:
+                return str(best)
+        return content.decode("utf-8", errors="replace")
+
+
+class BodyScanner:
+    """Inspect a page body chunk by chunk while it downloads.
+
+    Flags the verification wall as soon as its marker arrives, so the rest of
+    the body need not be downloaded, and picks up ``biz`` and ``createTime``
+    from the raw bytes so extractors can skip regex passes over the decoded
+    page. Assumes a UTF-8 page; ``parse_html`` still checks the decoded text.
+    """
+
+    # Longest match the patterns must see across a chunk boundary.
+    OVERLAP = 512
+
+    def __init__(self) -> None:
+        self.blocked = False
+        self.biz: Optional[str] = None
+        self.create_time: Optional[str] = None
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> None:
+        window = self._tail + chunk
+        if _VERIFICATION_MARKER_BYTES in window:
+            self.blocked = True
+        if self.biz is None:
+            match = _BIZ_BYTES_RE.search(window)
+            if match:
+                self.biz = _biz_from(match.group(1).decode("utf-8", errors="replace"))
+        if self.create_time is None:
+            match = _CREATE_TIME_BYTES_RE.search(window)
+            if match:
+                self.create_time = match.group(1).decode("utf-8", errors="replace")
+        self._tail = window[-self.OVERLAP :]
+
+    def hints(self) -> Dict[str, str]:
+        """Metadata already found, for ``Extractor.extract(html, hints)``."""
+        found: Dict[str, str] = {}
+        if self.biz is not None:
+            found["biz"] = self.biz
+        if self.create_time is not None:
+            found["create_time"] = self.create_time
+        return found
+
+
+def normalize_image_url(url: str) -> str:
+    if url.startswith("//"):
+        return f"https:{url}"
+    return url
+
+
+def normalize_publish_time(raw_value: str) -> str:
+    if not raw_value:
+        return ""
+    value = raw_value.strip()
+    if value.isdigit():
+        try:
+            timestamp = int(value)
+        except ValueError:
+            return ""
+        if timestamp > 10_000_000_000:
+            timestamp = int(timestamp / 1000)
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    return value
+
+
+def match_biz(text: str) -> str:
+    match = BIZ_RE.search(text)
+    return _biz_from(match.group(1)) if match else ""
+
+
+def _biz_from(expression: str) -> str:
+    for literal in _STRING_LITERAL_RE.findall(expression):
+        if literal:
+            return literal
+    return ""
+
+
+def match_create_time(text: str) -> str:
+    match = CREATE_TIME_RE.search(text)
+    return match.group(1) if match else ""
+
+
+def build_article(
+    *,
+    title: str,
+    author: str,
+    biz: str,
+    create_time: str,
+    content_text: str,
+    markdown: str,
+    images_count: int,
+) -> Dict[str, Any]:
+    return {
+        "title": title,
+        "author": author,
+        "biz": biz,
+        "create_time": create_time,
+        "publish_time": normalize_publish_time(create_time),
+        "content_html": content_text,
+        "content_markdown": markdown,
+        "images_count": images_count,
+    }
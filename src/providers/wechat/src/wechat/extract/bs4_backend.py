@@ -0,0 +1,78 @@
+# wechat_mcp/providers/wechat/extract/bs4_backend.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from mcp_server.core.metrics import phase
+from wechat.extract.base import build_article, match_biz, match_create_time
+from wechat.extract.markdown import render_markdown
+
+
+class _Bs4Adapter:
+    def name(self, el: Tag) -> str:
+        return el.name
+
+    def attr(self, el: Tag, key: str) -> Optional[str]:
+        value = el.get(key)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def children(self, el: Tag) -> List[Any]:
+        # Every child is a NavigableString (a ``str``) or a Tag.
+        return el.contents
+
+    def elements(self, el: Tag) -> List[Tag]:
+        return el.find_all(recursive=False)
+
+    def descendants(self, el: Tag, name: str) -> List[Tag]:
+        return el.find_all(name)
+
+    def text(self, el: Tag, separator: str = "", strip: bool = False) -> str:
+        return el.get_text(separator, strip=strip)
+
+
+_ADAPTER = _Bs4Adapter()
+
+
+class Bs4Extractor:
+    """Reference extractor on BeautifulSoup's pure-Python ``html.parser``."""
+
+    name = "bs4"
+
+    def extract(self, html: str, hints: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        hints = hints or {}
+        soup = BeautifulSoup(html, "html.parser")
+
+        content_node = soup.find("div", class_="rich_media_content") or soup.find(
+            "div", id="js_content"
+        )
+        content = content_node.get_text("\n", strip=True) if content_node else ""
+
+        title_node = soup.find("h1", {"class": "rich_media_title", "id": "activity-name"})
+        title = title_node.get_text(strip=True) if title_node else ""
+
+        author_node = soup.find("a", {"id": "js_name"})
+        author = author_node.get_text(strip=True) if author_node else ""
+
+        markdown_content = ""
+        images_count = 0
+        if isinstance(content_node, Tag):
+            with phase("markdown"):
+                markdown_content, images_count = render_markdown(
+                    _ADAPTER, content_node.find_all(recursive=False)
+                )
+            markdown_content = markdown_content.strip()
+
+        return build_article(
+            title=title,
+            author=author,
+            biz=hints["biz"] if "biz" in hints else match_biz(html),
+            create_time=hints["create_time"] if "create_time" in hints else match_create_time(html),
+            content_text=content,
+            markdown=markdown_content,
+            images_count=images_count,
+        )
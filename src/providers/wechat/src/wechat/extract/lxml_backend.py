@@ -0,0 +1,164 @@
+# wechat_mcp/providers/wechat/extract/lxml_backend.py
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from mcp_server.core.metrics import phase
+from wechat.extract.base import build_article, match_biz, match_create_time
+from wechat.extract.markdown import render_markdown
+
+# bs4 types text inside these tags as Script/Stylesheet/TemplateString/...,
+# which ``get_text`` skips; mirror that so both backends agree.
+_STRING_CONTAINERS = frozenset({"script", "style", "template", "rt", "rp"})
+# bs4 collapses whitespace-only strings to "\n" or " " outside these tags.
+_PRESERVE_WHITESPACE = frozenset({"pre", "textarea"})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+_local = threading.local()
+
+
+def _parser() -> lxml_html.HTMLParser:
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = lxml_html.HTMLParser(encoding="utf-8")
+    return parser
+
+
+def _classes(el) -> List[str]:
+    return (el.get("class") or "").split()
+
+
+def _collapse(text: str) -> str:
+    if text.strip(_ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
+
+
+def _iter_strings(root) -> Iterator[str]:
+    """Yield the text nodes under ``root`` in document order, like bs4's ``_all_strings``."""
+    own_container = root.tag in _STRING_CONTAINERS
+    skip_depth = 0
+    preserve_depth = 0
+    for event, el in etree.iterwalk(root, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            tag = el.tag
+            if tag in _STRING_CONTAINERS and not own_container:
+                skip_depth += 1
+            if tag in _PRESERVE_WHITESPACE:
+                preserve_depth += 1
+            if el.text and not skip_depth:
+                yield el.text if preserve_depth else _collapse(el.text)
+            continue
+        if event == "end":
+            tag = el.tag
+            if tag in _STRING_CONTAINERS and not own_container:
+                skip_depth -= 1
+            if tag in _PRESERVE_WHITESPACE:
+                preserve_depth -= 1
+        # "end" of an element, or a comment/PI: only the tail is text here.
+        if el is not root and el.tail and not skip_depth:
+            yield el.tail if preserve_depth else _collapse(el.tail)
+
+
+def _get_text(el, separator: str = "", strip: bool = False) -> str:
+    if not strip:
+        return separator.join(_iter_strings(el))
+    return separator.join(text for text in (s.strip() for s in _iter_strings(el)) if text)
+
+
+class _LxmlAdapter:
+    def name(self, el) -> str:
+        return el.tag
+
+    def attr(self, el, key: str) -> Optional[str]:
+        return el.get(key)
+
+    def children(self, el) -> List[Any]:
+        nodes: List[Any] = [_collapse(el.text)] if el.text else []
+        for child in el:
+            if isinstance(child.tag, str):
+                nodes.append(child)
+            elif child.tag is etree.Comment and child.text:
+                # bs4 keeps comments as strings; the renderer emits them verbatim.
+                nodes.append(_collapse(child.text))
+            if child.tail:
+                nodes.append(_collapse(child.tail))
+        return nodes
+
+    def elements(self, el) -> Iterator[Any]:
+        return (child for child in el if isinstance(child.tag, str))
+
+    def descendants(self, el, name: str) -> Iterator[Any]:
+        return el.iterdescendants(name)
+
+    def text(self, el, separator: str = "", strip: bool = False) -> str:
+        return _get_text(el, separator, strip)
+
+
+_ADAPTER = _LxmlAdapter()
+
+
+class LxmlExtractor:
+    """libxml2-backed extractor: one pass over the document locates every field."""
+
+    name = "lxml"
+
+    def extract(self, html: str, hints: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        try:
+            root = lxml_html.document_fromstring(html.encode("utf-8"), parser=_parser())
+        except etree.ParserError:  # empty document
+            root = None
+
+        content_node = id_node = title_node = author_node = None
+        hints = hints or {}
+        biz: Optional[str] = hints.get("biz")
+        create_time: Optional[str] = hints.get("create_time")
+        for el in root.iter() if root is not None else ():
+            tag = el.tag
+            if tag == "div":
+                if content_node is None and "rich_media_content" in _classes(el):
+                    content_node = el
+                elif id_node is None and el.get("id") == "js_content":
+                    id_node = el
+            elif tag == "h1":
+                if (
+                    title_node is None
+                    and el.get("id") == "activity-name"
+                    and "rich_media_title" in _classes(el)
+                ):
+                    title_node = el
+            elif tag == "a":
+                if author_node is None and el.get("id") == "js_name":
+                    author_node = el
+            elif tag == "script" and el.text and (biz is None or create_time is None):
+                if biz is None:
+                    biz = match_biz(el.text) or None
+                if create_time is None:
+                    create_time = match_create_time(el.text) or None
+        if content_node is None:
+            content_node = id_node
+
+        content = ""
+        markdown_content = ""
+        images_count = 0
+        if content_node is not None:
+            content = _get_text(content_node, "\n", strip=True)
+            with phase("markdown"):
+                markdown_content, images_count = render_markdown(
+                    _ADAPTER, _ADAPTER.elements(content_node)
+                )
+            markdown_content = markdown_content.strip()
+
+        return build_article(
+            title=_get_text(title_node, strip=True) if title_node is not None else "",
+            author=_get_text(author_node, strip=True) if author_node is not None else "",
+            biz=biz or "",
+            create_time=create_time or "",
+            content_text=content,
+            markdown=markdown_content,
+            images_count=images_count,
+        )
@@ -0,0 +1,168 @@
+# wechat_mcp/providers/wechat/extract/markdown.py
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+from wechat.extract.base import BLOCK_CONTAINERS, HEADINGS, normalize_image_url
+
+# Rendered child by child (so nested links, images and code survive) but,
+# unlike block containers, without a paragraph break afterwards.
+INLINE_CONTAINERS = ("span",)
+LISTS = ("ul", "ol")
+TABLE_CELLS = ("th", "td")
+
+
+class TreeAdapter(Protocol):
+    """Read-only view of a parsed tree, so one renderer serves every backend."""
+
+    def name(self, el: Any) -> str:
+        ...
+
+    def attr(self, el: Any, key: str) -> Optional[str]:
+        ...
+
+    def children(self, el: Any) -> Sequence[Any]:
+        """Child nodes in order: text as ``str`` (comments included), elements as-is."""
+
+    def elements(self, el: Any) -> Iterable[Any]:
+        """Child elements only."""
+
+    def descendants(self, el: Any, name: str) -> Iterable[Any]:
+        ...
+
+    def text(self, el: Any, separator: str = "", strip: bool = False) -> str:
+        ...
+
+
+@dataclass
+class _ListFrame:
+    el: Any
+    depth: int
+
+
+def render_markdown(adapter: TreeAdapter, nodes: Iterable[Any]) -> Tuple[str, int]:
+    """Render ``nodes`` (top-level content elements) to markdown.
+
+    Nesting is handled with an explicit LIFO work list rather than recursion,
+    and output is streamed into one ``StringIO`` buffer, so cost stays linear
+    in the size of the tree however deep it is.
+    Returns ``(markdown, images_count)``.
+    """
+    out = io.StringIO()
+    write = out.write
+    images = 0
+    # Items are popped from the end, so children are pushed in reverse.
+    work: List[Any] = list(nodes)
+    work.reverse()
+    while work:
+        item = work.pop()
+        if isinstance(item, str):
+            write(item)
+            continue
+        if isinstance(item, _ListFrame):
+            work.extend(reversed(_list_items(adapter, item)))
+            continue
+
+        name = adapter.name(item)
+        if name in BLOCK_CONTAINERS:
+            work.append("\n\n")
+            work.extend(reversed(adapter.children(item)))
+        elif name in INLINE_CONTAINERS:
+            work.extend(reversed(adapter.children(item)))
+        elif name in LISTS:
+            work.append("\n")
+            work.append(_ListFrame(item, 0))
+        elif name == "img":
+            images += 1
+            write(_image(adapter, item))
+        else:
+            write(_render_leaf(adapter, item, name))
+    return out.getvalue(), images
+
+
+def _list_items(adapter: TreeAdapter, frame: _ListFrame) -> List[Any]:
+    ordered = adapter.name(frame.el) == "ol"
+    try:
+        number = int(adapter.attr(frame.el, "start") or 1)
+    except ValueError:
+        number = 1
+    indent = "  " * frame.depth
+    items: List[Any] = []
+    for li in adapter.elements(frame.el):
+        if adapter.name(li) != "li":
+            continue
+        nested: List[Any] = []
+        words: List[str] = []
+        for child in adapter.children(li):
+            if isinstance(child, str):
+                words.append(child)
+            elif adapter.name(child) in LISTS:
+                nested.append(child)
+            else:
+                words.append(adapter.text(child))
+        marker = f"{number}." if ordered else "-"
+        number += 1
+        items.append(f"{indent}{marker} {' '.join(''.join(words).split())}\n")
+        items.extend(_ListFrame(sub, frame.depth + 1) for sub in nested)
+    return items
+
+
+def _image(adapter: TreeAdapter, el: Any) -> str:
+    img_src = adapter.attr(el, "data-src") or adapter.attr(el, "src") or ""
+    alt_text = adapter.attr(el, "alt") or "image"
+    return f"![{alt_text}]({normalize_image_url(img_src)})\n"
+
+
+def _render_leaf(adapter: TreeAdapter, el: Any, name: str) -> str:
+    if name in HEADINGS:
+        return f"{'#' * int(name[1])} {adapter.text(el, strip=True)}\n\n"
+
+    if name == "br":
+        return "\n"
+
+    if name == "blockquote":
+        content = adapter.text(el, "\n", strip=True)
+        return "".join(f"> {line}\n" for line in content.split("\n")) + "\n"
+
+    if name == "pre":
+        return f"```\n{adapter.text(el).strip()}\n```\n\n"
+
+    if name == "code":
+        code = adapter.text(el)
+        fence = "``" if "`" in code else "`"
+        return f"{fence}{code}{fence}" if code else ""
+
+    if name == "a":
+        return f"[{adapter.text(el, strip=True)}]({adapter.attr(el, 'href') or ''})"
+
+    if name == "strong":
+        return f"**{adapter.text(el, strip=True)}**"
+
+    if name == "table":
+        return _table(adapter, el)
+
+    return adapter.text(el)
+
+
+def _table(adapter: TreeAdapter, el: Any) -> str:
+    rows: List[List[str]] = []
+    for tr in adapter.descendants(el, "tr"):
+        cells = [
+            " ".join(adapter.text(cell, " ", strip=True).split()).replace("|", "\\|")
+            for cell in adapter.elements(tr)
+            if adapter.name(cell) in TABLE_CELLS
+        ]
+        if cells:
+            rows.append(cells)
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = []
+    for index, row in enumerate(rows):
+        row = row + [""] * (width - len(row))
+        lines.append(f"| {' | '.join(row)} |\n")
+        if index == 0:
+            lines.append(f"|{' --- |' * width}\n")
+    return "".join(lines) + "\n"
@@ -0,0 +1,12 @@
+# wechat_mcp/providers/wechat/http.py
+
+# Browser-like headers for every request to WeChat. The image CDN refuses
+# hotlinked requests without an mp.weixin.qq.com referer.
+HEADERS = {
+    "Referer": "https://mp.weixin.qq.com/",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/119.0.0.0 Safari/537.36"
+    ),
+}
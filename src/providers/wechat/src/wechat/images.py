@@ -0,0 +1,224 @@
+# wechat_mcp/providers/wechat/images.py
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import os
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from wechat.http import HEADERS
+
+IMAGE_STORE_EXTENSION = "wechat.image_store"
+
+# ``![alt](url)`` as written by ``render_markdown``.
+IMAGE_LINK_RE = re.compile(r"!\[([^\]]*)\]\((https?://[^)\s]+)\)")
+
+_CONTENT_TYPE_EXT = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/svg+xml": "svg",
+    "image/bmp": "bmp",
+}
+# mmbiz.qpic.cn URLs carry the format as ``?wx_fmt=png`` (or ``/640?wx_fmt=jpeg``).
+_WX_FMT_EXT = {"jpeg": "jpg", "jpg": "jpg", "png": "png", "gif": "gif", "webp": "webp", "svg": "svg", "bmp": "bmp"}
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class ImageReport:
+    """Outcome of localizing one article's images."""
+
+    # Original URL -> stored file.
+    paths: Dict[str, Path] = field(default_factory=dict)
+    downloaded: int = 0
+    reused: int = 0
+    failed: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total": len(self.paths) + len(self.failed),
+            "downloaded": self.downloaded,
+            "reused": self.reused,
+            "failed": len(self.failed),
+        }
+
+
+def image_urls(markdown: str) -> List[str]:
+    """Distinct image URLs in ``markdown``, in order of first appearance."""
+    return list(dict.fromkeys(match.group(2) for match in IMAGE_LINK_RE.finditer(markdown)))
+
+
+def rewrite_image_links(markdown: str, links: Dict[str, str]) -> str:
+    def replace(match: "re.Match[str]") -> str:
+        target = links.get(match.group(2))
+        return match.group(0) if target is None else f"![{match.group(1)}]({target})"
+
+    return IMAGE_LINK_RE.sub(replace, markdown)
+
+
+class ImageStore:
+    """Content-addressed image files under ``<root>/<sha256[:2]>/<sha256>.<ext>``.
+
+    Bodies are streamed through SHA-256 into a temp file and renamed into
+    place, so an image shared by many articles (logos, QR codes) is stored
+    once and never held in memory whole. Concurrent requests for the same
+    URL share one download, and URLs already stored are remembered in a
+    bounded LRU so repeat articles skip the network entirely.
+
+    A download runs as its own task that callers only wait on, so one caller
+    being cancelled (or hitting its deadline) does not fail the others; an
+    abandoned download still finishes within ``timeout`` and is remembered.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        max_bytes: int = 20 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+        timeout: float = 30.0,
+        memo_size: int = 4096,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[Tuple[str, str], Path]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Task[Tuple[Path, bool]]"] = {}
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "ImageStore":
+        cfg = config.get("wechat", {}).get("images", {})
+        return ImageStore(
+            concurrency=int(cfg.get("concurrency", 8)),
+            max_bytes=int(cfg.get("max_bytes", 20 * 1024 * 1024)),
+            chunk_size=int(cfg.get("chunk_size", 64 * 1024)),
+            timeout=float(cfg.get("timeout", 30.0)),
+            memo_size=int(cfg.get("memo_size", 4096)),
+        )
+
+    async def localize(
+        self, ctx, urls: List[str], root: Path, concurrency: Optional[int] = None
+    ) -> ImageReport:
+        """Make sure every URL is stored under ``root``; failures are reported, not raised."""
+        report = ImageReport()
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.concurrency))
+
+        async def one(url: str) -> None:
+            async with semaphore:
+                try:
+                    path, fetched = await self.get(ctx, url, root)
+                except Exception as exc:
+                    ctx.logger.info("image %s: %s", url, exc)
+                    report.failed.append(url)
+                    return
+            report.paths[url] = path
+            if fetched:
+                report.downloaded += 1
+            else:
+                report.reused += 1
+
+        await asyncio.gather(*(one(url) for url in urls))
+        return report
+
+    async def get(self, ctx, url: str, root: Path) -> Tuple[Path, bool]:
+        """Return ``(path, downloaded)`` for ``url``, downloading it at most once."""
+        key = (str(root), url)
+        path = self._memo.get(key)
+        if path is not None and path.exists():
+            self._memo.move_to_end(key)
+            return path, False
+
+        task = self._inflight.get(key)
+        if task is not None:
+            path, _ = await asyncio.shield(task)
+            return path, False
+
+        task = asyncio.get_running_loop().create_task(
+            self._download(ctx, url, root), context=contextvars.Context()
+        )
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._landed(key, done))
+        return await asyncio.shield(task)
+
+    def _landed(self, key: Tuple[str, str], task: "asyncio.Task[Tuple[Path, bool]]") -> None:
+        self._inflight.pop(key, None)
+        # Also marks a failure nobody is left to await as retrieved.
+        if not task.cancelled() and task.exception() is None:
+            self._remember(key, task.result()[0])
+
+    def _remember(self, key: Tuple[str, str], path: Path) -> None:
+        self._memo[key] = path
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    async def _download(self, ctx, url: str, root: Path) -> Tuple[Path, bool]:
+        tmp_dir = root / ".tmp"
+        await ctx.run_sync(tmp_dir.mkdir, parents=True, exist_ok=True)
+        tmp = tmp_dir / f"{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        handle = await ctx.run_sync(open, tmp, "wb")
+        try:
+            async with ctx.http.astream("GET", url, headers=HEADERS, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                content_type = resp.headers.get("content-type", "")
+                async for chunk in resp.aiter_bytes(self.chunk_size):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ImageTooLarge(f"larger than {self.max_bytes} bytes")
+                    digest.update(chunk)
+                    await ctx.run_sync(handle.write, chunk)
+            await ctx.run_sync(handle.close)
+            name = digest.hexdigest()
+            final = root / name[:2] / f"{name}.{_extension(url, content_type)}"
+            fetched = await ctx.run_sync(_commit, tmp, final)
+            return final, fetched
+        except BaseException:
+            await ctx.run_sync(_discard, handle, tmp)
+            raise
+
+
+def _commit(tmp: Path, final: Path) -> bool:
+    """Move ``tmp`` into place; ``False`` when identical content was already stored."""
+    if final.exists():
+        tmp.unlink(missing_ok=True)
+        return False
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp, final)
+    return True
+
+
+def _discard(handle: Any, tmp: Path) -> None:
+    handle.close()
+    tmp.unlink(missing_ok=True)
+
+
+def _extension(url: str, content_type: str) -> str:
+    ext = _CONTENT_TYPE_EXT.get(content_type.split(";", 1)[0].strip().lower())
+    if ext:
+        return ext
+    parts = urlsplit(url)
+    fmt = parse_qs(parts.query).get("wx_fmt", [""])[0].lower()
+    if fmt in _WX_FMT_EXT:
+        return _WX_FMT_EXT[fmt]
+    suffix = Path(parts.path).suffix.lstrip(".").lower()
+    return _WX_FMT_EXT.get(suffix, "img")
+
+
+def get_image_store(ctx) -> ImageStore:
+    return ctx.extensions[IMAGE_STORE_EXTENSION]
@@ -0,0 +1,209 @@
+# wechat_mcp/providers/wechat/index.py
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from mcp_server.core.db import Database
+
+INDEX_EXTENSION = "wechat.article_index"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wechat_mp_articles (
+    biz TEXT NOT NULL,
+    aid TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    digest TEXT,
+    cover TEXT,
+    author TEXT,
+    create_time INTEGER NOT NULL,
+    update_time INTEGER,
+    indexed_at REAL NOT NULL,
+    PRIMARY KEY (biz, aid)
+);
+CREATE INDEX IF NOT EXISTS wechat_mp_articles_time
+    ON wechat_mp_articles (biz, create_time DESC, aid DESC);
+CREATE TABLE IF NOT EXISTS wechat_mp_sync (
+    biz TEXT PRIMARY KEY,
+    high_water INTEGER NOT NULL DEFAULT 0,
+    upstream_total INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+_COLUMNS = ("biz", "aid", "title", "link", "digest", "cover", "author", "create_time", "update_time", "indexed_at")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SyncState:
+    biz: str
+    # ``create_time`` of the newest indexed article; pages past it are not re-fetched.
+    high_water: int = 0
+    # Article count reported by WeChat at the last sync.
+    upstream_total: int = 0
+    # The whole history has been paged through at least once.
+    complete: bool = False
+    synced_at: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "high_water": self.high_water,
+            "upstream_total": self.upstream_total,
+            "complete": self.complete,
+            "synced_at": self.synced_at,
+        }
+
+
+def encode_cursor(create_time: int, aid: str) -> str:
+    raw = json.dumps([create_time, aid], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        create_time, aid = json.loads(raw)
+        return int(create_time), str(aid)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(f"invalid cursor: {cursor!r}") from exc
+
+
+class ArticleIndex:
+    """Per-author article index and sync state stored in ``AppContext.db``.
+
+    Articles are keyed by ``(biz, aid)`` and listed newest first with keyset
+    pagination on ``(create_time, aid)``, so a page costs one index range scan
+    however deep the cursor is and stays stable while new articles arrive.
+    """
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+        self._db.executescript(_SCHEMA)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, biz: str) -> asyncio.Lock:
+        """Serializes syncs of one author; dropped once nobody holds it."""
+        lock = self._locks.get(biz)
+        if lock is None:
+            lock = self._locks[biz] = asyncio.Lock()
+        return lock
+
+    def state(self, biz: str) -> SyncState:
+        row = self._db.execute(
+            "SELECT high_water, upstream_total, complete, synced_at FROM wechat_mp_sync WHERE biz = ?",
+            (biz,),
+        ).fetchone()
+        if row is None:
+            return SyncState(biz)
+        high_water, upstream_total, complete, synced_at = row
+        return SyncState(biz, int(high_water), int(upstream_total), bool(complete), float(synced_at))
+
+    def known(self, biz: str, aids: Sequence[str]) -> Set[str]:
+        if not aids:
+            return set()
+        rows = self._db.execute(
+            f"SELECT aid FROM wechat_mp_articles WHERE biz = ? AND aid IN ({', '.join('?' * len(aids))})",
+            (biz, *aids),
+        )
+        return {aid for (aid,) in rows}
+
+    def count(self, biz: str) -> int:
+        (total,) = self._db.execute("SELECT COUNT(*) FROM wechat_mp_articles WHERE biz = ?", (biz,)).fetchone()
+        return int(total)
+
+    def add(self, biz: str, articles: Iterable[Dict[str, Any]]) -> int:
+        """Upsert ``articles`` and return how many were not indexed before."""
+        now = time.time()
+        rows = [
+            (
+                biz,
+                str(a["aid"]),
+                a.get("title") or "",
+                a.get("link") or "",
+                a.get("digest"),
+                a.get("cover"),
+                a.get("author"),
+                int(a.get("create_time") or 0),
+                a.get("update_time"),
+                now,
+            )
+            for a in articles
+        ]
+        if not rows:
+            return 0
+        with self._db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO wechat_mp_articles ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows,
+            )
+            added = conn.total_changes - before
+            # Titles and covers can be edited after publishing; keep the latest.
+            conn.executemany(
+                "UPDATE wechat_mp_articles SET title = ?, link = ?, digest = ?, cover = ?, author = ?, "
+                "update_time = ? WHERE biz = ? AND aid = ?",
+                [(r[2], r[3], r[4], r[5], r[6], r[8], r[0], r[1]) for r in rows],
+            )
+        return added
+
+    def save_state(self, state: SyncState) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO wechat_mp_sync (biz, high_water, upstream_total, complete, synced_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (state.biz, state.high_water, state.upstream_total, int(state.complete), state.synced_at),
+        )
+
+    def page(
+        self, biz: str, limit: int, cursor: Optional[str] = None, since: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Up to ``limit`` articles older than ``cursor``, newest first, plus the next cursor."""
+        sql = (
+            "SELECT aid, title, link, digest, cover, author, create_time, update_time "
+            "FROM wechat_mp_articles WHERE biz = ?"
+        )
+        params: List[Any] = [biz]
+        if cursor:
+            create_time, aid = decode_cursor(cursor)
+            sql += " AND (create_time < ? OR (create_time = ? AND aid < ?))"
+            params += [create_time, create_time, aid]
+        if since is not None:
+            sql += " AND create_time >= ?"
+            params.append(since)
+        sql += " ORDER BY create_time DESC, aid DESC LIMIT ?"
+        # One extra row tells whether another page exists.
+        params.append(limit + 1)
+        rows = self._db.execute(sql, params).fetchall()
+        articles = [
+            {
+                "aid": aid,
+                "title": title,
+                "link": link,
+                "digest": digest,
+                "cover": cover,
+                "author": author,
+                "create_time": create_time,
+                "update_time": update_time,
+            }
+            for aid, title, link, digest, cover, author, create_time, update_time in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = articles[-1]
+            next_cursor = encode_cursor(last["create_time"], last["aid"])
+        return articles, next_cursor
+
+
+def get_article_index(ctx) -> ArticleIndex:
+    return ctx.extensions[INDEX_EXTENSION]
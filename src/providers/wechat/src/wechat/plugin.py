@@ -1,41 +1,132 @@
 ﻿# wechat_mcp/providers/wechat/plugin.py
-from src.mcp_server.core.registry import MCPTool
-from wechat.tools.article_fetch import article_fetch
-from wechat.tools.mp_search import mp_search
-from wechat.tools.mp_list import mp_list
+from functools import partial
+
+from mcp_server.core.admission import LimitConfig
+from mcp_server.core.registry import MCPTool
+from wechat.authors import AUTHOR_INDEX_EXTENSION, AuthorIndex
+from wechat.cache import CACHE_EXTENSION, ArticleCache
+from wechat.constants import FETCH_ADMISSION_EXTENSION
+from wechat.images import IMAGE_STORE_EXTENSION, ImageStore
+from wechat.index import INDEX_EXTENSION, ArticleIndex
 
 
 def register(registry, ctx):
+    ctx.extensions[CACHE_EXTENSION] = ArticleCache.from_config(ctx.db, ctx.config)
+    ctx.extensions[IMAGE_STORE_EXTENSION] = ImageStore.from_config(ctx.config)
+    ctx.extensions[INDEX_EXTENSION] = ArticleIndex(ctx.db)
+    ctx.extensions[AUTHOR_INDEX_EXTENSION] = AuthorIndex.from_config(ctx.db, ctx.config)
+
+    # Identical fetches arriving together hit WeChat once; the result is then
+    # reused for a few seconds to absorb bursts.
+    coalesce_window = float(ctx.config.get("wechat", {}).get("coalesce_window", 2.0))
+    # Network-bound tools get bounded queues so a burst fails fast instead of
+    # starving cheap tools; the fetch limit backs off when WeChat slows down.
+    fetch_limits = LimitConfig(max_concurrency=16, max_queue=64, adaptive=True, min_concurrency=2)
+    fetch_many_limits = LimitConfig(max_concurrency=4, max_queue=8)
+
+    # Handlers are "module:function" references, imported on their first call.
     registry.register(
         MCPTool(
             name="wechat.article.fetch",
-            description="Fetch a wechat article (not implemented)",
+            description="Fetch a wechat article as markdown plus metadata, cached and optionally saved to disk",
             input_schema={
                 "type": "object",
                 "properties": {
-                    "url": {"type": "string"},
+                    "url": {"type": "string", "pattern": "^https?://"},
                     "timeout": {"type": "integer", "minimum": 1, "maximum": 120},
                     "out_dir": {"type": "string"},
                     "save_files": {"type": "boolean"},
+                    "use_cache": {"type": "boolean"},
+                    "download_images": {"type": "boolean"},
+                    "image_concurrency": {"type": "integer", "minimum": 1, "maximum": 32},
                 },
                 "required": ["url"],
             },
-            handler=article_fetch,
+            handler="wechat.tools.article_fetch:article_fetch",
+            stream_handler="wechat.tools.article_fetch:article_fetch_stream",
+            coalesce=True,
+            coalesce_window=coalesce_window,
+            cache_flag="use_cache",
+            limits=fetch_limits,
+        )
+    )
+    # fetch_many items count against the single-fetch limit, not just their own call's.
+    ctx.extensions[FETCH_ADMISSION_EXTENSION] = partial(registry.admitted, "wechat.article.fetch", ctx)
+    registry.register(
+        MCPTool(
+            name="wechat.article.fetch_many",
+            description="Fetch several wechat articles concurrently, paced per host",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "urls": {
+                        "type": "array",
+                        "items": {"type": "string", "pattern": "^https?://"},
+                        "minItems": 1,
+                        "maxItems": 200,
+                    },
+                    "concurrency": {"type": "integer", "minimum": 1, "maximum": 32},
+                    "timeout": {"type": "integer", "minimum": 1, "maximum": 120},
+                    "out_dir": {"type": "string"},
+                    "save_files": {"type": "boolean"},
+                    "use_cache": {"type": "boolean"},
+                    "download_images": {"type": "boolean"},
+                    "image_concurrency": {"type": "integer", "minimum": 1, "maximum": 32},
+                },
+                "required": ["urls"],
+            },
+            handler="wechat.tools.article_fetch_many:article_fetch_many",
+            stream_handler="wechat.tools.article_fetch_many:article_fetch_many_stream",
+            coalesce=True,
+            coalesce_window=coalesce_window,
+            cache_flag="use_cache",
+            limits=fetch_many_limits,
+        )
+    )
+    registry.register(
+        MCPTool(
+            name="wechat.accounts.status",
+            description="Show per-account request counts, verification hits and quarantine state",
+            input_schema={"type": "object", "properties": {}},
+            handler="wechat.tools.account_status:account_status",
         )
     )
     registry.register(
         MCPTool(
             name="wechat.mp.search_author",
-            description="Search a wechat mp author (not implemented)",
-            input_schema={"type": "object", "properties": {}, "additionalProperties": True},
-            handler=mp_search,
+            description="Search wechat accounts by name (prefix, substring, fuzzy) in the local author index",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "minLength": 1, "maxLength": 64},
+                    "limit": {"type": "integer", "minimum": 1, "maximum": 50},
+                    "fuzzy": {"type": "boolean"},
+                    "remote": {"type": "boolean"},
+                },
+                "required": ["query"],
+            },
+            handler="wechat.tools.mp_search:mp_search",
         )
     )
     registry.register(
         MCPTool(
             name="wechat.mp.list_author_articles",
-            description="List wechat mp author articles (not implemented)",
-            input_schema={"type": "object", "properties": {}, "additionalProperties": True},
-            handler=mp_list,
+            description="List an author's articles newest first from the local index, syncing new ones incrementally",
+            input_schema={
+                "type": "object",
+                "properties": {
+                    "biz": {"type": "string", "minLength": 1, "maxLength": 64},
+                    "limit": {"type": "integer", "minimum": 1, "maximum": 100},
+                    "cursor": {"type": "string"},
+                    "since": {"type": "integer", "minimum": 0},
+                    "sync": {"type": "boolean"},
+                    "refresh": {"type": "boolean"},
+                    "backfill": {"type": "boolean"},
+                    "max_pages": {"type": "integer", "minimum": 1, "maximum": 200},
+                },
+                "required": ["biz"],
+            },
+            handler="wechat.tools.mp_list:mp_list",
+            limits=LimitConfig(max_concurrency=8, max_queue=32, adaptive=True),
         )
     )
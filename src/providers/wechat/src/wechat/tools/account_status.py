@@ -0,0 +1,14 @@
+# wechat_mcp/providers/wechat/tools/account_status.py
+from typing import Any, Dict
+
+from wechat.tools.article_fetch import COOKIE_PLATFORM
+
+_WECHAT_HOST = "mp.weixin.qq.com"
+
+
+def account_status(ctx, payload: Dict[str, Any]):
+    """Report the cookie account pool and the anonymous per-host limiter."""
+    return {
+        "accounts": ctx.accounts.snapshot(COOKIE_PLATFORM).get(COOKIE_PLATFORM, {}),
+        "anonymous": ctx.rate_limiter.snapshot(_WECHAT_HOST).get(_WECHAT_HOST),
+    }
@@ -1,15 +1,29 @@
-import json
+import os
 import re
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
 
-from bs4 import BeautifulSoup
-from bs4.element import NavigableString, Tag
 from pydantic import BaseModel, Field, HttpUrl, ValidationError
 
-from mcp_server.core.errors import ERROR_INVALID_INPUT, ERROR_TOOL_EXECUTION
-from mcp_server.core.response import fail_error
+from mcp_server.core.account_pool import AccountsBusy, AccountsThrottled
+from mcp_server.core.deadline import DeadlineExceeded
+from mcp_server.core.errors import (
+    ERROR_ACCOUNTS_THROTTLED,
+    ERROR_DEADLINE_EXCEEDED,
+    ERROR_INVALID_INPUT,
+    ERROR_TOOL_EXECUTION,
+)
+from mcp_server.core.hedging import HedgePolicy
+from mcp_server.core.metrics import phase
+from mcp_server.core.response import fail_error, overloaded
+from mcp_server.core.web import dumps_bytes
+from wechat.authors import AuthorIndex, get_author_index
+from wechat.cache import ArticleCache, get_article_cache, normalize_article_url
+from wechat.extract import BodyScanner, parse_html
+from wechat.http import HEADERS
+from wechat.images import get_image_store, image_urls, rewrite_image_links
 
 
 def _safe_filename(value: str, max_length: int = 120) -> str:
@@ -18,137 +32,249 @@ def _safe_filename(value: str, max_length: int = 120) -> str:
     return cleaned[:max_length] or "untitled"
 
 
-def _normalize_image_url(url: str) -> str:
-    if url.startswith("//"):
-        return f"https:{url}"
-    return url
-
-
-def _convert_tag_to_markdown(tag: Tag, img_counter: Dict[str, int]) -> str:
-    markdown_str = ""
-
-    if tag.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-        level = int(tag.name[1])
-        markdown_str = f"{'#' * level} {tag.get_text(strip=True)}\n\n"
-
-    elif tag.name in ["p", "section", "div"]:
-        for child in tag.children:
-            if isinstance(child, NavigableString):
-                markdown_str += str(child)
-            elif isinstance(child, Tag) and child.name == "img":
-                img_src = child.get("data-src") or child.get("src") or ""
-                img_src = _normalize_image_url(str(img_src))
-                alt_text = str(child.get("alt") or "image")
-                img_counter["value"] += 1
-                markdown_str += f"![{alt_text}]({img_src})\n"
-            elif isinstance(child, Tag) and child.name == "br":
-                markdown_str += "\n"
-            elif isinstance(child, Tag):
-                markdown_str += _convert_tag_to_markdown(child, img_counter)
-        markdown_str += "\n\n"
-
-    elif tag.name == "blockquote":
-        content = tag.get_text(separator="\n", strip=True)
-        markdown_str = "".join([f"> {line}\n" for line in content.split("\n")]) + "\n"
-
-    elif tag.name == "pre":
-        code_content = tag.get_text()
-        markdown_str = f"```\n{code_content.strip()}\n```\n\n"
-
-    elif tag.name == "a":
-        link_text = tag.get_text(strip=True)
-        href = tag.get("href", "")
-        markdown_str = f"[{link_text}]({href})"
-
-    elif tag.name == "strong":
-        markdown_str = f"**{tag.get_text(strip=True)}**"
-
-    else:
-        markdown_str = tag.get_text()
-
-    return markdown_str
-
-
-def _normalize_publish_time(raw_value: str) -> str:
-    if not raw_value:
-        return ""
-    value = raw_value.strip()
-    if value.isdigit():
-        try:
-            timestamp = int(value)
-        except ValueError:
-            return ""
-        if timestamp > 10_000_000_000:
-            timestamp = int(timestamp / 1000)
-        return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
-    return value
-
-
 class ArticleFetchIn(BaseModel):
     url: HttpUrl
     timeout: int = Field(default=30, ge=1, le=120)
     out_dir: str = Field(default="./wechat_articles")
     save_files: bool = Field(default=True)
+    use_cache: bool = Field(default=True)
+    # Store images under ``<out_dir>/images`` and point the markdown at them.
+    download_images: bool = Field(default=False)
+    image_concurrency: Optional[int] = Field(default=None, ge=1, le=32)
 
 
-def article_fetch(ctx, payload: Dict[str, Any]):
+VERIFICATION_HINT = "verification required"
+HEDGE_EXTENSION = "wechat.hedge_policy"
+# Default for [wechat].max_body_bytes; real articles are well under 5 MB.
+DEFAULT_MAX_BODY_BYTES = 16 * 1024 * 1024
+# Markdown is streamed in pieces of this many characters.
+MARKDOWN_CHUNK_CHARS = 8192
+# CookieManager platform whose accounts are rotated by ``ctx.accounts``.
+COOKIE_PLATFORM = "wechat"
+
+
+async def article_fetch(ctx, payload: Dict[str, Any]):
     try:
         data = ArticleFetchIn.model_validate(payload)
     except ValidationError as e:
         return fail_error(ERROR_INVALID_INPUT, str(e))
+    return await fetch_article(ctx, data)
 
-    headers = {
-        "Referer": "https://mp.weixin.qq.com/",
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/119.0.0.0 Safari/537.36"
-        ),
-    }
 
+async def article_fetch_stream(ctx, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Stream one article: a ``meta`` chunk first, then ``markdown`` pieces.
+
+    ``content_html`` is left out; the markdown carries the same text.
+    """
     try:
-        resp = ctx.http.get(str(data.url), headers=headers, timeout=data.timeout)
-    except Exception as exc:
-        return fail_error(ERROR_TOOL_EXECUTION, str(exc))
+        data = ArticleFetchIn.model_validate(payload)
+    except ValidationError as e:
+        yield fail_error(ERROR_INVALID_INPUT, str(e))
+        return
+    result = await fetch_article(ctx, data)
+    if not result.get("ok"):
+        yield result
+        return
+
+    article = result["data"]
+    markdown = article["content_markdown"]
+    yield {
+        "kind": "meta",
+        "data": {key: value for key, value in article.items() if key not in ("content_html", "content_markdown")},
+        "meta": result["meta"],
+    }
+    for offset in range(0, len(markdown), MARKDOWN_CHUNK_CHARS):
+        yield {"kind": "markdown", "offset": offset, "text": markdown[offset : offset + MARKDOWN_CHUNK_CHARS]}
 
-    if resp.status_code != 200:
-        return fail_error(ERROR_TOOL_EXECUTION, f"status {resp.status_code}")
 
-    resp.encoding = resp.apparent_encoding
-    if re.search("当前环境异常，完成验证后即可继续访问", resp.text):
-        return fail_error(ERROR_TOOL_EXECUTION, "verification required")
+def is_verification_wall(result: Dict[str, Any]) -> bool:
+    error = result.get("error") or {}
+    return not result.get("ok") and error.get("hint") == VERIFICATION_HINT
 
-    html = resp.text
-    soup = BeautifulSoup(html, "html.parser")
 
-    content_node = soup.find("div", class_="rich_media_content") or soup.find(
-        "div", id="js_content"
-    )
-    content = content_node.get_text("\n", strip=True) if content_node else ""
+async def fetch_article(ctx, data: ArticleFetchIn) -> Dict[str, Any]:
+    """Fetch, parse and optionally save one article; shared by the single and bulk tools."""
+    url = str(data.url)
+    cache = get_article_cache(ctx) if data.use_cache else None
+    cache_key = normalize_article_url(url)
+    with phase("cache"):
+        entry = await ctx.run_sync(cache.get, cache_key) if cache else None
+    if entry is not None and entry.fresh:
+        return await _complete(ctx, entry.article, data, "hit")
 
-    title_node = soup.find("h1", {"class": "rich_media_title", "id": "activity-name"})
-    title = title_node.get_text(strip=True) if title_node else ""
+    headers = dict(HEADERS)
+    if entry is not None:
+        headers.update(entry.validators())
 
-    author_node = soup.find("a", {"id": "js_name"})
-    author = author_node.get_text(strip=True) if author_node else ""
+    # Every request respects the per-host cap; leased ones are also paced per account.
+    with phase("throttle"):
+        try:
+            lease = await ctx.accounts.acquire(COOKIE_PLATFORM)
+        except AccountsThrottled as exc:
+            return fail_error(ERROR_ACCOUNTS_THROTTLED, str(exc))
+        except AccountsBusy as exc:
+            return overloaded(exc.retry_after)
+        if lease is not None:
+            headers["Cookie"] = lease.cookie
+        await ctx.rate_limiter.acquire(url)
+
+    result: Optional[Dict[str, Any]] = None
+    try:
+        try:
+            with phase("network"):
+                page = await _download(ctx, url, headers, data.timeout, _max_body_bytes(ctx), _hedge_policy(ctx))
+        except DeadlineExceeded as exc:
+            return fail_error(ERROR_DEADLINE_EXCEEDED, str(exc))
+        except Exception as exc:
+            return fail_error(ERROR_TOOL_EXECUTION, str(exc))
+
+        if page.status_code == 304 and entry is not None:
+            await ctx.run_sync(cache.refresh, cache_key)
+            return await _complete(ctx, entry.article, data, "revalidated")
+
+        if page.status_code != 200:
+            return fail_error(ERROR_TOOL_EXECUTION, f"status {page.status_code}")
+
+        if page.scanner.blocked:
+            article = None
+        else:
+            # Network stays here; decoding and parsing get only the raw bytes and may
+            # run in a worker process ([server].cpu_workers).
+            with phase("parse"):
+                article = await ctx.run_cpu(
+                    parse_html, page.content, page.charset, _extract_backend(ctx), page.scanner.hints()
+                )
+        if article is None:
+            result = fail_error(ERROR_TOOL_EXECUTION, VERIFICATION_HINT)
+        else:
+            await ctx.run_sync(_store, page, article, cache, cache_key, get_author_index(ctx))
+            result = await _complete(ctx, article, data, "miss" if cache is not None else "bypass")
+        if lease is not None and result.get("ok"):
+            result["meta"]["account"] = lease.account
+        return result
+    finally:
+        blocked = result is not None and is_verification_wall(result)
+        # A wall met with an account's cookie is that account's; only anonymous walls slow the host.
+        if lease is not None:
+            ctx.accounts.release(lease, blocked=blocked)
+        elif result is not None:
+            ctx.rate_limiter.report(url, blocked=blocked)
+
+
+@dataclass
+class _Page:
+    status_code: int
+    headers: Mapping[str, str]
+    charset: Optional[str] = None
+    content: bytes = b""
+    scanner: BodyScanner = field(default_factory=BodyScanner)
+
+
+async def _download(
+    ctx,
+    url: str,
+    headers: Dict[str, str],
+    timeout: int,
+    max_bytes: int,
+    hedge: Optional[HedgePolicy] = None,
+) -> _Page:
+    """Stream the page body, stopping early at the verification wall.
+
+    Bodies over ``max_bytes`` (by ``Content-Length`` or as counted) raise
+    ``ValueError``. Non-200 bodies are not read at all.
+    """
+    async with ctx.http.astream("GET", url, hedge=hedge, headers=headers, timeout=timeout) as resp:
+        page = _Page(resp.status_code, resp.headers, resp.charset_encoding)
+        if resp.status_code != 200:
+            return page
+        declared = resp.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > max_bytes:
+            raise ValueError(f"response body of {declared} bytes exceeds {max_bytes}")
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in resp.aiter_bytes():
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"response body exceeds {max_bytes} bytes")
+            chunks.append(chunk)
+            page.scanner.feed(chunk)
+            if page.scanner.blocked:
+                break
+        page.content = b"".join(chunks)
+        return page
+
+
+def _hedge_policy(ctx) -> Optional[HedgePolicy]:
+    # Parsed once per context; ``None`` unless [wechat.hedge].enabled.
+    if HEDGE_EXTENSION not in ctx.extensions:
+        cfg = ctx.config.get("wechat", {}).get("hedge", {})
+        ctx.extensions[HEDGE_EXTENSION] = HedgePolicy.from_dict(cfg) if cfg.get("enabled", False) else None
+    return ctx.extensions[HEDGE_EXTENSION]
+
+
+def _max_body_bytes(ctx) -> int:
+    return int(ctx.config.get("wechat", {}).get("max_body_bytes", DEFAULT_MAX_BODY_BYTES))
+
+
+def _store(
+    page: _Page,
+    article: Dict[str, Any],
+    cache: Optional[ArticleCache],
+    cache_key: str,
+    authors: Optional[AuthorIndex] = None,
+) -> None:
+    if authors is not None and article.get("biz") and article.get("author"):
+        # Feeds wechat.mp.search_author; cache hits were recorded when first parsed.
+        with phase("index"):
+            authors.observe(article["biz"], article["author"])
+    if cache is not None:
+        with phase("cache"):
+            cache.put(
+                cache_key,
+                article,
+                etag=page.headers.get("etag"),
+                last_modified=page.headers.get("last-modified"),
+            )
+
+
+async def _complete(ctx, article: Dict[str, Any], data: ArticleFetchIn, cache_status: str) -> Dict[str, Any]:
+    images: Optional[Dict[str, Any]] = None
+    if data.download_images:
+        with phase("images"):
+            article, images = await _localize_images(ctx, article, data)
+    return await ctx.run_sync(_finish, ctx, article, data, cache_status, images)
+
+
+async def _localize_images(ctx, article: Dict[str, Any], data: ArticleFetchIn):
+    """Download the article's images and rewrite its markdown to the local copies.
+
+    The cached article keeps the original URLs; links are made relative to
+    ``<out_dir>/md`` where the markdown file is saved.
+    """
+    out_dir = Path(data.out_dir).resolve()
+    markdown = article["content_markdown"]
+    report = await get_image_store(ctx).localize(
+        ctx, image_urls(markdown), out_dir / "images", data.image_concurrency
+    )
+    links = {url: Path(os.path.relpath(path, out_dir / "md")).as_posix() for url, path in report.paths.items()}
+    return {**article, "content_markdown": rewrite_image_links(markdown, links)}, report.summary()
 
-    biz_match = re.search(r"var biz\\s*=\\s*\"(.*?)\";", html)
-    biz = ""
-    if biz_match:
-        biz = biz_match.group(1).replace('" || "', "").replace('"', "")
 
-    time_match = re.search(r"var createTime = '(.*?)';", html)
-    create_time = time_match.group(1) if time_match else ""
-    publish_time_iso = _normalize_publish_time(create_time)
+def _extract_backend(ctx) -> str:
+    return ctx.config.get("wechat", {}).get("extract", {}).get("backend", "auto")
 
-    markdown_content = ""
-    img_counter = {"value": 0}
-    if isinstance(content_node, Tag):
-        markdown_parts = []
-        for tag in content_node.find_all(recursive=False):
-            if isinstance(tag, Tag):
-                markdown_parts.append(_convert_tag_to_markdown(tag, img_counter))
-        markdown_content = "".join(markdown_parts).strip()
+
+def _finish(
+    ctx,
+    article: Dict[str, Any],
+    data: ArticleFetchIn,
+    cache_status: str,
+    images: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    title = article["title"]
+    author = article["author"]
+    publish_time_iso = article["publish_time"]
+    markdown_content = article["content_markdown"]
 
     output: Dict[str, Any] = {
         "ok": True,
@@ -156,11 +282,11 @@ def article_fetch(ctx, payload: Dict[str, Any]):
             "title": title,
             "author": author,
             "publish_time": publish_time_iso,
-            "biz": biz,
+            "biz": article["biz"],
             "url": str(data.url),
-            "content_html": content,
+            "content_html": article["content_html"],
             "content_markdown": markdown_content,
-            "images_count": img_counter["value"],
+            "images_count": article["images_count"],
             "word_count": len(markdown_content),
             "summary": None,
         },
@@ -169,31 +295,34 @@ def article_fetch(ctx, payload: Dict[str, Any]):
             "source": "wechat",
             "tool": "wechat.article.fetch",
             "version": "1.0",
+            "cache": cache_status,
         },
     }
+    if images is not None:
+        output["meta"]["images"] = images
 
     if data.save_files:
-        out_dir = Path(data.out_dir).resolve()
-        json_dir = out_dir / "json"
-        md_dir = out_dir / "md"
-        json_dir.mkdir(parents=True, exist_ok=True)
-        md_dir.mkdir(parents=True, exist_ok=True)
-
-        base_name = _safe_filename(f"{author}-{title}-{create_time}")
-        markdown_path = md_dir / f"{base_name}.md"
-        with markdown_path.open("w", encoding="utf-8") as f:
+        # Paths are decided (and reported) now; the writes happen behind the response.
+        with phase("write"):
+            out_dir = Path(data.out_dir).resolve()
+            base_name = _safe_filename(f"{author}-{title}-{article['create_time']}")
+            markdown_path = out_dir / "md" / f"{base_name}.md"
+            json_path = out_dir / "json" / f"{base_name}.json"
+
+            header = ""
             if title:
-                f.write(f"# {title}\n\n")
+                header += f"# {title}\n\n"
             if author:
-                f.write(f"**Author:** {author}\n\n")
+                header += f"**Author:** {author}\n\n"
             if publish_time_iso:
-                f.write(f"**Published:** {publish_time_iso}\n\n")
-            f.write(markdown_content)
-
-        output["meta"]["markdown_file"] = str(markdown_path)
-
-        json_path = json_dir / f"{base_name}.json"
-        with json_path.open("w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+                header += f"**Published:** {publish_time_iso}\n\n"
+
+            output["meta"]["markdown_file"] = str(markdown_path)
+            ctx.writer.submit_many(
+                [
+                    (markdown_path, header + markdown_content),
+                    (json_path, dumps_bytes(output, indent=True)),
+                ]
+            )
 
     return output
@@ -0,0 +1,102 @@
+# wechat_mcp/providers/wechat/tools/article_fetch_many.py
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import BaseModel, Field, HttpUrl, ValidationError
+
+from mcp_server.core.errors import ERROR_INVALID_INPUT, ERROR_TOOL_EXECUTION
+from mcp_server.core.response import fail_error
+from wechat.constants import FETCH_ADMISSION_EXTENSION
+from wechat.tools.article_fetch import ArticleFetchIn, fetch_article
+
+
+class ArticleFetchManyIn(BaseModel):
+    urls: List[HttpUrl] = Field(min_length=1, max_length=200)
+    concurrency: int = Field(default=4, ge=1, le=32)
+    timeout: int = Field(default=30, ge=1, le=120)
+    out_dir: str = Field(default="./wechat_articles")
+    save_files: bool = Field(default=True)
+    use_cache: bool = Field(default=True)
+    download_images: bool = Field(default=False)
+    image_concurrency: Optional[int] = Field(default=None, ge=1, le=32)
+
+
+async def iter_fetch_many(ctx, data: ArticleFetchManyIn) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one result per URL as soon as it finishes, tagged with its input index.
+
+    Concurrency is capped per call, and every item also takes a slot of
+    ``wechat.article.fetch``'s admission limit, so concurrent bulk calls
+    cannot multiply past it; an item refused there fails with
+    ``overloaded``. Inside ``fetch_article`` every item takes a token from
+    ``ctx.rate_limiter``'s per-host cap; items sent with a leased account
+    are also paced per account by ``ctx.accounts``, which quarantines that
+    account after a verification wall, while anonymous items back off the
+    host instead.
+    """
+    semaphore = asyncio.Semaphore(data.concurrency)
+    admitted = ctx.extensions.get(FETCH_ADMISSION_EXTENSION)
+
+    async def fetch(item: ArticleFetchIn) -> Dict[str, Any]:
+        try:
+            return await fetch_article(ctx, item)
+        except Exception as exc:
+            return fail_error(ERROR_TOOL_EXECUTION, str(exc))
+
+    async def fetch_one(index: int, url: HttpUrl) -> Dict[str, Any]:
+        item = ArticleFetchIn(
+            url=url,
+            timeout=data.timeout,
+            out_dir=data.out_dir,
+            save_files=data.save_files,
+            use_cache=data.use_cache,
+            download_images=data.download_images,
+            image_concurrency=data.image_concurrency,
+        )
+        async with semaphore:
+            if admitted is None:
+                result = await fetch(item)
+            else:
+                result = await admitted(lambda: fetch(item))
+        return {"index": index, "url": str(url), **result}
+
+    tasks = [asyncio.create_task(fetch_one(i, url)) for i, url in enumerate(data.urls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def article_fetch_many_stream(ctx, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Stream each result as it completes, then a ``summary`` chunk."""
+    try:
+        data = ArticleFetchManyIn.model_validate(payload)
+    except ValidationError as e:
+        yield fail_error(ERROR_INVALID_INPUT, str(e))
+        return
+
+    succeeded = failed = 0
+    async for item in iter_fetch_many(ctx, data):
+        if item.get("ok"):
+            succeeded += 1
+        else:
+            failed += 1
+        yield {"kind": "result", **item}
+    yield {"kind": "summary", "succeeded": succeeded, "failed": failed}
+
+
+async def article_fetch_many(ctx, payload: Dict[str, Any]):
+    try:
+        data = ArticleFetchManyIn.model_validate(payload)
+    except ValidationError as e:
+        return fail_error(ERROR_INVALID_INPUT, str(e))
+
+    results = [item async for item in iter_fetch_many(ctx, data)]
+    succeeded = sum(1 for item in results if item.get("ok"))
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
@@ -1,9 +1,241 @@
 ﻿# wechat_mcp/providers/wechat/tools/mp_list.py
-from typing import Dict, Any
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
-from mcp_server.core.errors import ERROR_NOT_IMPLEMENTED
-from mcp_server.core.response import fail_error
+from pydantic import BaseModel, Field, ValidationError
 
+from mcp_server.core.account_pool import AccountsBusy, AccountsThrottled
+from mcp_server.core.errors import (
+    ERROR_ACCOUNTS_THROTTLED,
+    ERROR_COOKIE_NOT_FOUND,
+    ERROR_INVALID_INPUT,
+    ERROR_TOOL_EXECUTION,
+)
+from mcp_server.core.metrics import phase
+from mcp_server.core.response import fail_error, overloaded
+from wechat.http import HEADERS
+from wechat.index import ArticleIndex, InvalidCursor, SyncState, get_article_index
+from wechat.tools.article_fetch import COOKIE_PLATFORM
 
-def mp_list(ctx, payload: Dict[str, Any]):
-    return fail_error(ERROR_NOT_IMPLEMENTED)
+SYNC_CONFIG_EXTENSION = "wechat.sync_config"
+# ``base_resp.ret`` of the mp backend when an account is being rate limited.
+RET_FREQUENCY_CONTROL = 200013
+
+_HEADERS = {**HEADERS, "X-Requested-With": "XMLHttpRequest"}
+
+
+class MpListIn(BaseModel):
+    # The author's ``__biz`` (the mp backend calls it ``fakeid``).
+    biz: str = Field(min_length=1, max_length=64)
+    limit: int = Field(default=20, ge=1, le=100)
+    # ``next_cursor`` of the previous page.
+    cursor: Optional[str] = None
+    # Only articles created at or after this unix time.
+    since: Optional[int] = Field(default=None, ge=0)
+    # Bring the index up to date before answering (skipped within [wechat.sync].min_interval).
+    sync: bool = Field(default=True)
+    refresh: bool = Field(default=False)
+    # Also page further back into history that has never been indexed.
+    backfill: bool = Field(default=False)
+    max_pages: Optional[int] = Field(default=None, ge=1, le=200)
+
+
+@dataclass(frozen=True)
+class SyncConfig:
+    list_url: str = "https://mp.weixin.qq.com/cgi-bin/appmsg"
+    page_size: int = 5
+    # Pages per call for a first sync or a backfill.
+    max_pages: int = 10
+    # Seconds after a sync during which the index is served as is.
+    min_interval: float = 600.0
+    timeout: float = 20.0
+    # Account name -> mp backend session token (the ``token=`` of a logged-in session).
+    tokens: Dict[str, str] = field(default_factory=dict)
+
+    @staticmethod
+    def from_config(config: Dict[str, Any]) -> "SyncConfig":
+        cfg = config.get("wechat", {}).get("sync", {})
+        base = SyncConfig()
+        return SyncConfig(
+            list_url=str(cfg.get("list_url", base.list_url)),
+            page_size=int(cfg.get("page_size", base.page_size)),
+            max_pages=int(cfg.get("max_pages", base.max_pages)),
+            min_interval=float(cfg.get("min_interval", base.min_interval)),
+            timeout=float(cfg.get("timeout", base.timeout)),
+            tokens={str(k): str(v) for k, v in cfg.get("tokens", {}).items() if v},
+        )
+
+
+class SyncError(RuntimeError):
+    pass
+
+
+class NoAccount(SyncError):
+    pass
+
+
+async def mp_list(ctx, payload: Dict[str, Any]):
+    """List an author's articles from the local index, syncing new ones first.
+
+    A sync pages the mp backend's article list (newest first) only until it
+    reaches the stored high-water mark, so a routine sync of a quiet author
+    costs one request. If the sync fails, whatever is already indexed is
+    still served, with the error under ``sync.error``.
+    """
+    try:
+        data = MpListIn.model_validate(payload)
+    except ValidationError as e:
+        return fail_error(ERROR_INVALID_INPUT, str(e))
+
+    index = get_article_index(ctx)
+    sync: Dict[str, Any] = {"skipped": True}
+    error: Optional[Dict[str, Any]] = None
+    if data.sync:
+        try:
+            sync = await sync_author(ctx, index, sync_config(ctx), data)
+        except AccountsThrottled as exc:
+            error = fail_error(ERROR_ACCOUNTS_THROTTLED, str(exc))
+        except AccountsBusy as exc:
+            error = overloaded(exc.retry_after)
+        except NoAccount as exc:
+            error = fail_error(ERROR_COOKIE_NOT_FOUND, str(exc))
+        except Exception as exc:
+            error = fail_error(ERROR_TOOL_EXECUTION, str(exc))
+
+    with phase("index"):
+        try:
+            articles, next_cursor = await ctx.run_sync(index.page, data.biz, data.limit, data.cursor, data.since)
+        except InvalidCursor as exc:
+            return fail_error(ERROR_INVALID_INPUT, str(exc))
+        total = await ctx.run_sync(index.count, data.biz)
+    if error is not None:
+        if total == 0:
+            return error
+        sync = {"skipped": False, "error": error["error"]}
+    return {
+        "biz": data.biz,
+        "articles": articles,
+        "next_cursor": next_cursor,
+        "indexed": total,
+        "sync": sync,
+    }
+
+
+async def sync_author(ctx, index: ArticleIndex, cfg: SyncConfig, data: MpListIn) -> Dict[str, Any]:
+    """Index articles newer than the high-water mark (and older ones with ``backfill``)."""
+    biz = data.biz
+    async with index.lock(biz):
+        state = await ctx.run_sync(index.state, biz)
+        recent = time.time() - state.synced_at < cfg.min_interval
+        if recent and not data.refresh and not (data.backfill and not state.complete):
+            return {"skipped": True, "pages": 0, "new_articles": 0, **state.summary()}
+
+        budget = data.max_pages or cfg.max_pages
+        pages = added = 0
+        high_water, total, complete = state.high_water, state.upstream_total, state.complete
+
+        # Newest first until the previous high-water mark. Articles of one push
+        # share a create_time, so at the mark itself only known ones stop the walk.
+        # The first sync is capped at ``budget`` pages; later ones run to the mark.
+        begin = 0
+        while state.high_water or pages < budget:
+            items, total = await _fetch_page(ctx, cfg, biz, begin)
+            pages += 1
+            known = await ctx.run_sync(index.known, biz, [item["aid"] for item in items])
+            added += await ctx.run_sync(index.add, biz, items)
+            high_water = max([high_water] + [item["create_time"] for item in items])
+            begin += len(items)
+            if not items or begin >= total:
+                complete = True
+                break
+            if any(
+                item["create_time"] < state.high_water
+                or (item["create_time"] == state.high_water and item["aid"] in known)
+                for item in items
+            ):
+                break
+        # The mark only moves once everything above it is indexed.
+        state = SyncState(biz, high_water, total, complete, time.time())
+        await ctx.run_sync(index.save_state, state)
+
+        if data.backfill and not complete and pages < budget:
+            # Offsets shift as new articles are published; start a page early and rely on dedup.
+            begin = max(0, await ctx.run_sync(index.count, biz) - cfg.page_size)
+            while pages < budget:
+                items, total = await _fetch_page(ctx, cfg, biz, begin)
+                pages += 1
+                added += await ctx.run_sync(index.add, biz, items)
+                begin += len(items)
+                if not items or begin >= total:
+                    complete = True
+                    break
+            state = SyncState(biz, high_water, total, complete, state.synced_at)
+            await ctx.run_sync(index.save_state, state)
+
+    return {"skipped": False, "pages": pages, "new_articles": added, **state.summary()}
+
+
+async def _fetch_page(ctx, cfg: SyncConfig, biz: str, begin: int) -> Tuple[List[Dict[str, Any]], int]:
+    """One page of the mp backend's ``appmsg?action=list_ex``, as index rows plus the total count."""
+    params = {"action": "list_ex", "begin": begin, "count": cfg.page_size, "fakeid": biz, "type": 9, "query": ""}
+    body = await mp_backend_get(ctx, cfg, cfg.list_url, params)
+    items = [_index_row(item) for item in body.get("app_msg_list") or [] if item.get("aid")]
+    return items, int(body.get("app_msg_cnt") or 0)
+
+
+async def mp_backend_get(ctx, cfg: SyncConfig, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """GET a JSON endpoint of the mp backend with a leased account and its session token.
+
+    Raises ``NoAccount`` without a usable account, ``SyncError`` on an error
+    status or ``base_resp.ret``; frequency control quarantines the account.
+    """
+    with phase("throttle"):
+        lease = await ctx.accounts.acquire(COOKIE_PLATFORM)
+    if lease is None:
+        raise NoAccount("the mp backend needs a logged-in wechat account cookie")
+    blocked = False
+    try:
+        token = cfg.tokens.get(lease.account)
+        if not token:
+            raise NoAccount(f"no [wechat.sync.tokens] entry for account {lease.account}")
+        # The per-host cap covers the mp backend too (same host as article pages).
+        with phase("throttle"):
+            await ctx.rate_limiter.acquire(url)
+        params = {**params, "token": token, "lang": "zh_CN", "f": "json", "ajax": 1}
+        with phase("network"):
+            resp = await ctx.http.aget(
+                url, params=params, headers={**_HEADERS, "Cookie": lease.cookie}, timeout=cfg.timeout
+            )
+        if resp.status_code != 200:
+            raise SyncError(f"status {resp.status_code}")
+        body = resp.json()
+        base = body.get("base_resp") or {}
+        ret = base.get("ret", -1)
+        if ret == RET_FREQUENCY_CONTROL:
+            blocked = True
+            raise SyncError(f"account {lease.account} is rate limited by wechat")
+        if ret != 0:
+            raise SyncError(f"mp backend request failed: ret={ret} {base.get('err_msg', '')}".strip())
+        return body
+    finally:
+        ctx.accounts.release(lease, blocked=blocked)
+
+
+def _index_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "aid": str(item["aid"]),
+        "title": item.get("title") or "",
+        "link": item.get("link") or "",
+        "digest": item.get("digest") or None,
+        "cover": item.get("cover") or None,
+        "author": item.get("author_name") or None,
+        "create_time": int(item.get("create_time") or item.get("update_time") or 0),
+        "update_time": int(item["update_time"]) if item.get("update_time") else None,
+    }
+
+
+def sync_config(ctx) -> SyncConfig:
+    if SYNC_CONFIG_EXTENSION not in ctx.extensions:
+        ctx.extensions[SYNC_CONFIG_EXTENSION] = SyncConfig.from_config(ctx.config)
+    return ctx.extensions[SYNC_CONFIG_EXTENSION]
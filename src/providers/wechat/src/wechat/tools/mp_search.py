@@ -1,9 +1,80 @@
 ﻿# wechat_mcp/providers/wechat/tools/mp_search.py
-from typing import Dict, Any
+from typing import Any, Dict, List
 
-from mcp_server.core.errors import ERROR_NOT_IMPLEMENTED
-from mcp_server.core.response import fail_error
+from pydantic import BaseModel, Field, ValidationError
 
+from mcp_server.core.account_pool import AccountsBusy, AccountsThrottled
+from mcp_server.core.errors import (
+    ERROR_ACCOUNTS_THROTTLED,
+    ERROR_COOKIE_NOT_FOUND,
+    ERROR_INVALID_INPUT,
+    ERROR_TOOL_EXECUTION,
+)
+from mcp_server.core.metrics import phase
+from mcp_server.core.response import fail_error, overloaded
+from wechat.authors import get_author_index
+from wechat.tools.mp_list import NoAccount, mp_backend_get, sync_config
 
-def mp_search(ctx, payload: Dict[str, Any]):
-    return fail_error(ERROR_NOT_IMPLEMENTED)
+DEFAULT_SEARCH_URL = "https://mp.weixin.qq.com/cgi-bin/searchbiz"
+
+
+class MpSearchIn(BaseModel):
+    query: str = Field(min_length=1, max_length=64)
+    limit: int = Field(default=10, ge=1, le=50)
+    fuzzy: bool = Field(default=True)
+    # Ask the mp backend when the local index has no match.
+    remote: bool = Field(default=True)
+
+
+async def mp_search(ctx, payload: Dict[str, Any]):
+    """Search accounts by name in the local author index, remotely only on a miss.
+
+    The index is fed by every article ``wechat.article.fetch`` parses and by
+    earlier remote searches, whose results are recorded. A query that found
+    nothing remotely is not repeated within ``[wechat.authors].remote_ttl``.
+    """
+    try:
+        data = MpSearchIn.model_validate(payload)
+    except ValidationError as e:
+        return fail_error(ERROR_INVALID_INPUT, str(e))
+
+    index = get_author_index(ctx)
+    with phase("index"):
+        authors = await ctx.run_sync(index.search, data.query, data.limit, data.fuzzy)
+    cfg = ctx.config.get("wechat", {}).get("authors", {})
+    if authors or not data.remote or not cfg.get("remote_search", True):
+        return {"query": data.query, "authors": authors, "source": "index"}
+    if await ctx.run_sync(index.searched_recently, data.query, float(cfg.get("remote_ttl", 86400))):
+        return {"query": data.query, "authors": [], "source": "index"}
+
+    params = {"action": "search_biz", "begin": 0, "count": int(cfg.get("remote_count", 5)), "query": data.query}
+    try:
+        body = await mp_backend_get(ctx, sync_config(ctx), str(cfg.get("search_url", DEFAULT_SEARCH_URL)), params)
+    except AccountsThrottled as exc:
+        return fail_error(ERROR_ACCOUNTS_THROTTLED, str(exc))
+    except AccountsBusy as exc:
+        return overloaded(exc.retry_after)
+    except NoAccount as exc:
+        return fail_error(ERROR_COOKIE_NOT_FOUND, str(exc))
+    except Exception as exc:
+        return fail_error(ERROR_TOOL_EXECUTION, str(exc))
+
+    found: List[Dict[str, Any]] = [
+        {
+            "biz": item["fakeid"],
+            "name": item["nickname"],
+            "alias": item.get("alias") or None,
+            "avatar": item.get("round_head_img") or None,
+            "signature": item.get("signature") or None,
+        }
+        for item in body.get("list") or []
+        if item.get("fakeid") and item.get("nickname")
+    ]
+    with phase("index"):
+        await ctx.run_sync(index.record, found, "search")
+        await ctx.run_sync(index.mark_searched, data.query, len(found))
+        authors = await ctx.run_sync(index.search, data.query, data.limit, data.fuzzy)
+    if not authors:
+        # WeChat matched on something the index does not hold (e.g. a pinyin spelling).
+        authors = [{**author, "source": "search", "match": "remote"} for author in found[: data.limit]]
+    return {"query": data.query, "authors": authors, "source": "remote"}